@@ -0,0 +1,54 @@
+"""Hand-coded corrections of dates and participant numbers that could not be parsed.
+
+The corrections are entered into `data/interim/unparsable_dates.json` and
+`data/interim/unparsable_participant_numbers.json`, which map the original text to the correct
+value (or to null if there is none). They are compiled into typed lookup tables, which are kept
+in the stage cache (see `stage_cache`), so they are only compiled again when the file changes.
+"""
+
+import json
+import sys
+
+import pandas as pd
+
+from german_protest_registrations.paths import data
+from german_protest_registrations.stage_cache import stage
+
+date_corrections_file = data / "interim/unparsable_dates.json"
+participant_corrections_file = data / "interim/unparsable_participant_numbers.json"
+
+
+def _inputs(file) -> list:
+    return [file]
+
+
+def _modules(file) -> list:
+    return [sys.modules[__name__]]
+
+
+def _load(file) -> pd.Series:
+    with open(file) as f:
+        return pd.Series(json.load(f), dtype=object)
+
+
+@stage(_inputs, _modules)
+def _compile_dates(file) -> pd.DataFrame:
+    # the corrections are written day first, like most of the original texts
+    dates = pd.to_datetime(_load(file), format="%d.%m.%Y", errors="coerce")
+    return dates.dropna().to_frame("value")
+
+
+@stage(_inputs, _modules)
+def _compile_numbers(file) -> pd.DataFrame:
+    numbers = pd.to_numeric(_load(file), errors="coerce")
+    return numbers.dropna().astype("Int64").to_frame("value")
+
+
+def date_corrections(file=date_corrections_file) -> pd.Series:
+    """Lookup table from the original text of a date to the corrected date."""
+    return _compile_dates(file)["value"]
+
+
+def participant_corrections(file=participant_corrections_file) -> pd.Series:
+    """Lookup table from a normalised participant number text to the corrected number."""
+    return _compile_numbers(file)["value"]
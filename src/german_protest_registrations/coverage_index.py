@@ -0,0 +1,129 @@
+"""Monthly coverage of the unified dataset, and subsets of the cities that are well covered.
+
+The coverage index has a row for every city and month, with the number of events and the share
+of events with participant numbers. Subsets are defined by constraints on the index, such as
+"every month of 2018-2023 has events with participant numbers", instead of lists of cities, so
+they stay correct as data arrives. The published subsets (see `unify.split_datasets`) are
+defined this way by `subset_flags`, with the curated exceptions of the coverage table on top.
+"""
+
+import sys
+
+import pandas as pd
+
+from german_protest_registrations.stage_cache import stage
+from german_protest_registrations.unify import (
+    date_rules_version,
+    get_unified_dataset,
+    participant_columns,
+    pipeline_inputs,
+    pipeline_modules,
+)
+
+
+def build_coverage_index(df: pd.DataFrame) -> pd.DataFrame:
+    """Number of events, and share of events with each participant number, per city and month.
+
+    `participants` is the share with any participant number. The index has every month from
+    the first to the last month of the data for every city; months without events have no
+    shares.
+    """
+    # the Arrow-backed dates of a zero-copy snapshot have no periods, so NumPy dates are used
+    month = df["date"].astype("datetime64[ns]").dt.to_period("M").dt.to_timestamp()
+    known = df[participant_columns].notna()
+    known["participants"] = known.any(axis=1)
+    groups = known.groupby([df["city"].astype(str).rename("city"), month.rename("month")])
+    index = groups.mean()
+    index.insert(0, "events", groups.size())
+    months = pd.date_range(month.min(), month.max(), freq="MS", name="month")
+    grid = pd.MultiIndex.from_product([index.index.levels[0], months])
+    index = index.reindex(grid)
+    index["events"] = index["events"].fillna(0).astype(int)
+    return index
+
+
+def _modules(**params) -> list:
+    return pipeline_modules() + [sys.modules[__name__]]
+
+
+@stage(pipeline_inputs, _modules, version=date_rules_version)
+def get_coverage_index() -> pd.DataFrame:
+    """The coverage index of the unified dataset."""
+    return build_coverage_index(get_unified_dataset())
+
+
+def _months(start: str, end: str) -> pd.DatetimeIndex:
+    return pd.date_range(
+        pd.Period(start, "M").start_time, pd.Period(end, "M").start_time, freq="MS"
+    )
+
+
+def select_cities(
+    index: pd.DataFrame,
+    start: str,
+    end: str,
+    columns=(),
+    min_events: int = 1,
+    min_ratio: float = 0.5,
+    min_months: float = 1.0,
+) -> list[str]:
+    """The cities that are covered from the month of `start` to the month of `end`.
+
+    A month is covered if it has at least `min_events` events, of which at least `min_ratio`
+    have a value for each of the `columns` of the index (e.g. "participants"). A city is
+    selected if at least the share `min_months` of the months are covered.
+    """
+    months = _months(start, end)
+    index = index[index.index.get_level_values("month").isin(months)]
+    covered = index["events"] >= min_events
+    for column in columns:
+        covered &= index[column] >= min_ratio
+    share = covered.groupby(level="city").sum() / len(months)
+    return share.index[share >= min_months].tolist()
+
+
+def build_subset(
+    df: pd.DataFrame, index: pd.DataFrame, start: str, end: str, **constraints
+) -> tuple[list[str], pd.DataFrame]:
+    """The cities selected by `select_cities`, and their rows from `start` to `end`."""
+    cities = select_cities(index, start, end, **constraints)
+    months = _months(start, end)
+    in_range = (df["date"] >= months[0]) & (df["date"] < months[-1] + pd.offsets.MonthBegin())
+    return cities, df[in_range & df["city"].isin(cities)]
+
+
+def participant_share(index: pd.DataFrame) -> pd.Series:
+    """The share of all events of each city that have a participant number."""
+    events = index["events"].groupby(level="city").sum()
+    known = (index["events"] * index["participants"].fillna(0)).groupby(level="city").sum()
+    return known / events
+
+
+def subset_flags(
+    index: pd.DataFrame, overrides: pd.DataFrame, min_participants: float = 0.25
+) -> pd.DataFrame:
+    """Whether each city is part of the published subsets, as in the coverage table.
+
+    `participants`: at least the share `min_participants` of the city's events have a
+    participant number. `in_2018_2023`: every month of 2018-2023 has events. Where the
+    `overrides` (the coverage table) have a value for a city, it is taken instead.
+    """
+    cities = index.index.get_level_values("city").unique().union(overrides.index)
+    computed = pd.DataFrame(
+        {
+            "participants": participant_share(index).reindex(cities) >= min_participants,
+            "in_2018_2023": cities.isin(select_cities(index, "2018-01", "2023-12")),
+        },
+        index=cities,
+    )
+    given = overrides.reindex(index=cities, columns=computed.columns)
+    return computed.astype(object).where(given.isna(), given).astype(bool)
+
+
+if __name__ == "__main__":
+    index = get_coverage_index()
+    print(index["events"].unstack().T.resample("YS").sum().T)
+    cities, df = build_subset(
+        get_unified_dataset(), index, "2018-01", "2023-12", columns=["participants"]
+    )
+    print(f"{len(df)} events in 2018-2023 from the cities {', '.join(cities)}")
@@ -4,7 +4,8 @@ import pandas as pd
 import qwikidata.sparql
 from dotenv import load_dotenv
 
-from german_protest_registrations.unify import cache, get_unified_dataset
+from german_protest_registrations.snapshot import load_snapshot
+from german_protest_registrations.stage_cache import stage
 
 load_dotenv()
 
@@ -28,8 +29,13 @@ german_regions = [
 ]
 
 
-@cache
-def get_population(city, region, country="Deutschland"):
+def _nothing(**params) -> list:
+    # the population is only looked up once, regardless of any files or code
+    return []
+
+
+@stage(_nothing, _nothing)
+def _population(city, region, country) -> pd.DataFrame:
     sleep(1)
     if city == "Freiburg":
         city = "Freiburg im Breisgau"
@@ -50,7 +56,11 @@ def get_population(city, region, country="Deutschland"):
     res = qwikidata.sparql.return_sparql_query_results(query)
     out = res["results"]["bindings"][0]
     pop = int(out["population"]["value"])
-    return pop
+    return pd.DataFrame({"population": [pop]})
+
+
+def get_population(city, region, country="Deutschland"):
+    return int(_population(city, region, country)["population"].iloc[0])
 
 
 def is_capital(city, region):
@@ -58,15 +68,17 @@ def is_capital(city, region):
 
 
 def overview_table():
-    df = get_unified_dataset()
+    columns = ["region", "city", "date", "participants_registered", "participants_actual"]
+    df = load_snapshot(columns, zero_copy=True)
     df["year"] = df["date"].dt.year.astype(str).apply(lambda x: x[-2:])
     agg_df = df.groupby(["region", "city", "year"]).size().unstack().fillna(0).astype(int)
     # add column to agg_df whether or not the "Teilnehmer" column is available
+    # (as float, so that the mean of only missing values is NaN rather than NA)
     agg_df["registrations"] = df.groupby(["region", "city"]).apply(
-        lambda x: x["participants_registered"].mean() > 10
+        lambda x: x["participants_registered"].astype(float).mean() > 10
     )
     agg_df["observations"] = df.groupby(["region", "city"]).apply(
-        lambda x: x["participants_actual"].mean() > 10
+        lambda x: x["participants_actual"].astype(float).mean() > 10
     )
 
     agg_df["capital"] = agg_df.apply(lambda x: is_capital(x.name[1], x.name[0]), axis=1)
@@ -0,0 +1,72 @@
+"""The processed datasets as Parquet datasets, partitioned by region, city and year.
+
+`export.export_datasets` writes them to `data/processed/<name>/region=.../city=.../year=.../`.
+Unlike the CSV files, they are not kept in git, and are written by `unify.get_all_datasets`.
+`load_dataset` only reads the partitions of the requested cities and years, and only the
+requested columns.
+"""
+
+import shutil
+from functools import reduce
+from operator import and_
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from german_protest_registrations.paths import data
+
+# the names of the processed datasets, by variant
+variants = {
+    "2023": "german_protest_registrations_12_cities_2023",
+    "2018-2023": "german_protest_registrations_4_cities_2018-2023",
+    "unfiltered": "german_protest_registrations_17_cities_unfiltered",
+}
+partitioning = ds.partitioning(
+    pa.schema([("region", pa.string()), ("city", pa.string()), ("year", pa.int16())]),
+    flavor="hive",
+)
+
+
+def as_text(df: pd.DataFrame) -> pd.DataFrame:
+    """Store object columns as strings; text columns can hold numbers and dates as well, which
+    are written as text to CSV."""
+    return df.astype({column: "string" for column in df.select_dtypes(object)})
+
+
+def write_dataset(df: pd.DataFrame, path):
+    """Write a processed dataset, with text dates, as a partitioned Parquet dataset."""
+    df = as_text(df.astype({"region": str, "city": str}))
+    df["year"] = df["date"].str[:4].astype("int16")
+    tmp = path.with_name(path.name + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    ds.write_dataset(table, tmp, format="parquet", partitioning=partitioning)
+    shutil.rmtree(path, ignore_errors=True)
+    tmp.rename(path)
+
+
+def load_dataset(variant: str = "unfiltered", columns=None, cities=None, years=None):
+    """Load a processed dataset ("2023", "2018-2023" or "unfiltered").
+
+    Only the given `columns` (default: all but the year) are read, of the given `cities` and
+    `years` (default: all). The rows are in the same order as in the CSV file.
+    """
+    dataset = ds.dataset(data / "processed" / variants[variant], partitioning=partitioning)
+    # the columns in the order of the written DataFrame, which pandas keeps in the metadata
+    names = [column["name"] for column in dataset.schema.pandas_metadata["columns"]]
+    names = [name for name in names if name != "year"]
+    columns = names if columns is None else list(columns)
+    conditions = []
+    if cities is not None:
+        conditions.append(ds.field("city").isin(list(cities)))
+    if years is not None:
+        conditions.append(ds.field("year").isin(list(years)))
+    keys = ["region", "city", "date"]
+    table = dataset.to_table(
+        columns=list(dict.fromkeys(keys + columns)),
+        filter=reduce(and_, conditions) if conditions else None,
+    )
+    # the partitions are read in the order of their (encoded) paths
+    df = table.to_pandas().sort_values(keys, kind="stable", ignore_index=True)
+    return df[columns]
@@ -0,0 +1,61 @@
+"""Write the datasets to `data/processed`, in several formats at once."""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from time import perf_counter
+
+import pandas as pd
+
+from german_protest_registrations.dataset import as_text, write_dataset
+from german_protest_registrations.paths import data
+from german_protest_registrations.stage_cache import _size
+
+# file suffixes, and "dataset" for a folder with a partitioned Parquet dataset (see `dataset`);
+# zstd compression requires the `zstandard` package
+export_formats = ["csv", "csv.gz", "csv.zst", "parquet", "dataset"]
+# gzip without a timestamp, so that unchanged data gives an unchanged file
+_compression = {".gz": {"method": "gzip", "mtime": 0}, ".zst": {"method": "zstd"}}
+
+
+def _path(name: str, file_format: str) -> Path:
+    return data / "processed" / (name if file_format == "dataset" else f"{name}.{file_format}")
+
+
+def _write(df: pd.DataFrame, path: Path, file_format: str) -> tuple[Path, float]:
+    start = perf_counter()
+    if file_format == "dataset":
+        write_dataset(df, path)
+    elif file_format == "parquet":
+        as_text(df).to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False, compression=_compression.get(path.suffix))
+    return path, perf_counter() - start
+
+
+def export_datasets(
+    datasets: dict[str, pd.DataFrame], formats=("csv",), jobs: int = 0
+) -> list[Path]:
+    """Write each dataset to `data/processed/<name>.<format>` for each of the `formats`, or to
+    the folder `data/processed/<name>` for "dataset".
+
+    The files are written in a pool of `jobs` worker processes (0: all cores, 1: in this
+    process). The time and size of every file is printed.
+    """
+    unknown = set(formats) - set(export_formats)
+    if unknown:
+        raise ValueError(f"Unknown export formats {unknown}, expected some of {export_formats}")
+    tasks = [
+        (df, _path(name, file_format), file_format)
+        for name, df in datasets.items()
+        for file_format in formats
+    ]
+    if jobs == 1 or len(tasks) < 2:
+        results = [_write(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(jobs or os.cpu_count(), len(tasks))) as executor:
+            results = list(executor.map(_write, *zip(*tasks)))
+    for path, seconds in results:
+        size = _size(path) / 2**20
+        print(f"Wrote {path.relative_to(data)} ({size:.2f} MB) in {seconds:.2f}s")
+    return [path for path, _ in results]
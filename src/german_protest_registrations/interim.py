@@ -0,0 +1,145 @@
+"""Read the interim tables in `data/interim`.
+
+The CSV files in `data/interim/csv` are the canonical interim format. `to_csv` can additionally
+write each table as Parquet to `data/interim/parquet`, with the text of the cells as strings and
+the types that `pd.read_csv` infers for the columns in the schema metadata. `read_interim`
+prefers these files, so that the readers do not have to parse the CSV files on every run, and
+readers that only need a few columns only load those.
+"""
+
+import json
+from io import StringIO
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+def parquet_path(csv_path: Path) -> Path:
+    """Map `.../interim/csv/<City>/<name>.csv` to `.../interim/parquet/<City>/<name>.parquet`."""
+    return csv_path.parents[2] / "parquet" / csv_path.parent.name / f"{csv_path.stem}.parquet"
+
+
+# the schema metadata key of the column types, and the texts that `pd.read_csv` reads as booleans
+types_key = b"read_csv_types"
+booleans = {
+    "True": True,
+    "TRUE": True,
+    "true": True,
+    "False": False,
+    "FALSE": False,
+    "false": False,
+}
+
+
+def _type_name(column: pd.Series) -> str:
+    # `pd.read_csv` gives an object column of booleans and NaN for booleans with gaps
+    if column.dtype == object and any(isinstance(value, bool) for value in column):
+        return "object[bool]"
+    return str(column.dtype)
+
+
+def to_parquet(csv_text: str) -> bytes:
+    """Convert interim CSV text to Parquet, with the cells as strings (missing values as null).
+
+    The types that `pd.read_csv` infers for the columns, other than text, are kept in the schema
+    metadata under `types_key`.
+    """
+    typed = pd.read_csv(StringIO(csv_text))
+    types = {column: _type_name(typed[column]) for column in typed.columns}
+    types = {column: name for column, name in types.items() if name != "object"}
+    table = pa.Table.from_pandas(pd.read_csv(StringIO(csv_text), dtype=str), preserve_index=False)
+    table = table.replace_schema_metadata(
+        {**table.schema.metadata, types_key: json.dumps(types).encode()}
+    )
+    buffer = pa.BufferOutputStream()
+    pq.write_table(table, buffer)
+    return buffer.getvalue().to_pybytes()
+
+
+def _restore_nan(column: pd.Series) -> pd.Series:
+    # Parquet returns missing strings as None, where `pd.read_csv` gives NaN
+    if column.dtype != object:
+        return column
+    values = column.to_numpy(copy=True)
+    values[pd.isna(values)] = np.nan
+    return pd.Series(values, index=column.index, name=column.name)
+
+
+def _convert(column: pd.Series, type_name: str) -> pd.Series:
+    # convert the text of a column to the type that `pd.read_csv` inferred for it
+    if type_name == "object[bool]":
+        return column.map(booleans).astype(object)
+    if type_name == "bool":
+        return column.map(booleans).astype(bool)
+    return pd.to_numeric(column).astype(type_name)
+
+
+def header_names(values) -> list[str]:
+    """Name columns after a header row the way pandas does."""
+    names = []
+    for i, value in enumerate(values):
+        name = f"Unnamed: {i}" if pd.isna(value) or value == "" else str(value)
+        # pandas renames duplicate columns to x, x.1, x.2, ...
+        deduplicated, n = name, 0
+        while deduplicated in names:
+            n += 1
+            deduplicated = f"{name}.{n}"
+        names.append(deduplicated)
+    return names
+
+
+def _skip_rows(df: pd.DataFrame, skiprows: int) -> pd.DataFrame:
+    """Emulate `pd.read_csv(..., skiprows=skiprows)` on a table read with the default header."""
+    names = header_names(df.iloc[skiprows - 1])
+    df = df.iloc[skiprows:].reset_index(drop=True)
+    return pd.DataFrame({name: df.iloc[:, i] for i, name in enumerate(names)})
+
+
+def _column_types(path: Path, file: Path) -> dict[str, str | None] | None:
+    """The columns of the Parquet version of an interim file, with the `pd.read_csv` types of
+    those that are not text (None for text), or None if the file is missing, older than the CSV
+    file, or was written without the types by an earlier version of `to_csv`."""
+    if not path.exists() or path.stat().st_mtime < file.stat().st_mtime:
+        return None
+    schema = pq.read_schema(path)
+    if not schema.metadata or types_key not in schema.metadata:
+        return None
+    types = json.loads(schema.metadata[types_key])
+    return {column: types.get(column) for column in schema.names}
+
+
+def read_interim(file: Path, skiprows: int = 0, usecols: set[str] | None = None) -> pd.DataFrame:
+    """Read an interim CSV file, or its Parquet version if that is up to date.
+
+    Without `usecols`, the columns have the types that `pd.read_csv` infers, which the Parquet
+    version stores. With `usecols`, only these columns (where present) are read, as strings
+    without type inference. The types of the rows after a skipped header are not stored, so
+    reading all columns with `skiprows` always reads the CSV file.
+    """
+    path = parquet_path(file)
+    types = _column_types(path, file)
+    if types is None or (skiprows and usecols is None):
+        if usecols is not None:
+            return pd.read_csv(
+                file, skiprows=skiprows, usecols=lambda column: column in usecols, dtype=str
+            )
+        return pd.read_csv(file, skiprows=skiprows)
+    if skiprows:
+        # the header is one of the rows, so all columns are needed to find the names
+        df = _skip_rows(pd.read_parquet(path), skiprows)
+        df = df[[column for column in df.columns if column in usecols]]
+    else:
+        columns = [column for column in types if usecols is None or column in usecols]
+        df = pd.read_parquet(path, columns=columns)
+    df = pd.DataFrame({column: _restore_nan(df[column]) for column in df.columns})
+    if usecols is not None:
+        return df
+    return pd.DataFrame(
+        {
+            column: df[column] if types[column] is None else _convert(df[column], types[column])
+            for column in df.columns
+        }
+    )
@@ -0,0 +1,87 @@
+"""Fast lookups of the events of a city in a date range, for dashboards.
+
+`EventIndex` sorts the unified dataset by city and date once, and keeps the offsets of each
+city, so that finding the events of a city between two dates takes two bisections instead of a
+scan over the whole dataset.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class EventIndex:
+    """The events of the unified dataset, sorted by city and date.
+
+    The dates of `start` and `end` are inclusive; either can be None for an open range.
+    `topic` selects the events whose topic contains the text, ignoring case.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        df = df.sort_values(["city", "date"], kind="stable", ignore_index=True)
+        self.df = df
+        self.dates = df["date"].to_numpy("datetime64[ns]")
+        self.topics = df["topic"].fillna("").astype(str).str.lower().to_numpy()
+        # the boundaries of the cities in the sorted frame, in the order of sort_values (which
+        # is the order of the categories of a categorical column)
+        cities = df["city"].astype(str).to_numpy()
+        starts = np.flatnonzero(np.append(True, cities[1:] != cities[:-1]))
+        ends = np.append(starts[1:], len(df))
+        self.offsets = dict(zip(cities[starts], zip(starts, ends)))
+
+    @classmethod
+    def from_unified(cls) -> "EventIndex":
+        from german_protest_registrations.unify import get_unified_dataset
+
+        return cls(get_unified_dataset())
+
+    @property
+    def cities(self) -> list[str]:
+        return list(self.offsets)
+
+    def positions(self, city: str, start=None, end=None) -> slice:
+        """The positions of the events of a city from `start` to `end` in `df`."""
+        first, last = self.offsets.get(city, (0, 0))
+        dates = self.dates[first:last]
+        if start is not None:
+            first += np.searchsorted(dates, pd.Timestamp(start).to_datetime64(), side="left")
+        if end is not None:
+            last -= len(dates) - np.searchsorted(
+                dates, pd.Timestamp(end).to_datetime64(), side="right"
+            )
+        return slice(first, max(first, last))
+
+    def _rows(self, city, start, end, topic) -> np.ndarray:
+        cities = [city] if isinstance(city, str) else city
+        positions = [self.positions(city, start, end) for city in cities]
+        rows = np.concatenate([np.arange(p.start, p.stop) for p in positions] + [[]]).astype(int)
+        if topic:
+            topic = topic.lower()
+            rows = rows[[topic in text for text in self.topics[rows]]]
+        return rows
+
+    def events(self, city, start=None, end=None, topic: str | None = None) -> pd.DataFrame:
+        """The events of a city (or of a list of cities) from `start` to `end`."""
+        return self.df.iloc[self._rows(city, start, end, topic)]
+
+    def count(self, city, start=None, end=None, topic: str | None = None) -> int:
+        """The number of events of a city (or of a list of cities) from `start` to `end`."""
+        if topic is None and isinstance(city, str):
+            positions = self.positions(city, start, end)
+            return positions.stop - positions.start
+        return len(self._rows(city, start, end, topic))
+
+    def aggregate(
+        self,
+        city,
+        start=None,
+        end=None,
+        freq: str = "W",
+        column: str = "participants_registered",
+        topic: str | None = None,
+    ) -> pd.DataFrame:
+        """The number of events and the sum of `column` per week ("W", labelled by the Sunday)
+        or month ("MS"), with a row for every period from the first to the last event."""
+        rows = self._rows(city, start, end, topic)
+        values = pd.Series(self.df[column].to_numpy()[rows], index=self.dates[rows])
+        values = values.sort_index(kind="stable").resample(freq)
+        return pd.DataFrame({"events": values.size(), column: values.sum()})
@@ -0,0 +1,37 @@
+"""Cache the result of each city reader.
+
+A reader is only run again when the files of its city (in `data/raw`, `data/interim/csv` and
+`data/interim/parquet`) or the source code of the readers has changed. Unlike caching a
+function of a whole DataFrame, this only hashes the input files, which are small. The results
+are kept in the stage cache (see `stage_cache`).
+"""
+
+import inspect
+
+from german_protest_registrations import interim
+from german_protest_registrations.paths import data
+from german_protest_registrations.readers import registry
+from german_protest_registrations.stage_cache import stage
+
+folders = ["raw", "interim/csv", "interim/parquet"]
+
+
+def cached_reader(city: str):
+    """Cache the result of a reader by the files of its city and its source.
+
+    The uncached reader remains available as `__wrapped__`, and the city as `city`.
+    """
+
+    def decorator(read):
+        def inputs() -> list:
+            return [data / folder / city for folder in folders]
+
+        def modules() -> list:
+            # the module that defines the reader, and the shared reading code it uses
+            return [inspect.getmodule(read), interim, registry]
+
+        wrapper = stage(inputs, modules)(read)
+        wrapper.city = city
+        return wrapper
+
+    return decorator
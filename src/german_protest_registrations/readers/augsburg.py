@@ -1,5 +1,8 @@
 import pandas as pd
 
+from german_protest_registrations.reader_cache import cached_reader
 
+
+@cached_reader("Augsburg")
 def augsburg():
     return pd.DataFrame()
@@ -1,21 +1,23 @@
 import pandas as pd
 
+from german_protest_registrations.interim import read_interim
 from german_protest_registrations.paths import data
+from german_protest_registrations.reader_cache import cached_reader
 
 
+@cached_reader("Berlin")
 def berlin():
     path = data / "interim/csv/Berlin"
     dfs = []
     fds_path = path / "2020.csv"
-    df = pd.read_csv(fds_path)
-    df = df.rename(
-        columns={
-            "Datum": "event_date",
-            "Thema": "topic",
-            "Teilnehmende (Angemeldet)": "participants_registered",
-            "Teilnehmende (tatsächlich)": "participants_actual",
-        }
-    )
+    fds_columns = {
+        "Datum": "event_date",
+        "Thema": "topic",
+        "Teilnehmende (Angemeldet)": "participants_registered",
+        "Teilnehmende (tatsächlich)": "participants_actual",
+    }
+    df = read_interim(fds_path, usecols=set(fds_columns))
+    df = df.rename(columns=fds_columns)
     # there is an overlap between the two files, so we cut off the first file
     df = df[pd.to_datetime(df["event_date"], format="%d.%m.%Y") < pd.to_datetime("2020-07-01")]
     df = df[["event_date", "topic", "participants_registered", "participants_actual"]]
@@ -23,7 +25,17 @@ def berlin():
     for file in path.glob("*.csv"):
         if file.resolve() == fds_path.resolve():
             continue
-        df = pd.read_csv(file)
+        df = read_interim(
+            file,
+            usecols={
+                "Datum",
+                "Von",
+                "Bis",
+                "Thema",
+                "Teilnehmende (angemeldet)",
+                "Teilnehmende (tatsächlich)",
+            },
+        )
         df = df.rename(
             columns={
                 "Datum": "event_date",
@@ -1,35 +1,10 @@
-import pandas as pd
-
-from german_protest_registrations.paths import data
+from german_protest_registrations.reader_cache import cached_reader
+from german_protest_registrations.readers.registry import cities, read_city
 
 
+@cached_reader("Bremen")
 def bremen():
-    path = data / "interim/csv/Bremen"
-    dfs = []
-    for file in path.glob("*.csv"):
-        df = pd.read_csv(file)
-        # Handle both old (2022) and new (2023) column names
-        df = df.rename(
-            columns={
-                "Beginn": "event_date",
-                "Ende": "event_date_end",
-                "Datum": "event_date",  # 2023 column name
-                "Versammlungsthema": "topic",
-                "Thema/Motto": "topic",  # 2023 column name
-                "Ort": "location",
-            },
-        )
-        if "event_date" in df.columns:
-            df["event_date"] = df["event_date"].str.replace("NV", "")
-        if "event_date_end" in df.columns:
-            df["event_date_end"] = df["event_date_end"].str.replace("NV", "")
-        dfs.append(df)
-    df = pd.concat(dfs)
-    df = df[["event_date", "topic", "location"]]
-    df["city"] = "Bremen"
-    df["region"] = "Bremen"
-    df["is_regional_capital"] = True
-    return df
+    return read_city(cities["Bremen"])
 
 
 if __name__ == "__main__":
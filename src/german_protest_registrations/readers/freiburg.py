@@ -1,27 +1,10 @@
-import pandas as pd
-
-from german_protest_registrations.paths import data
+from german_protest_registrations.reader_cache import cached_reader
+from german_protest_registrations.readers.registry import cities, read_city
 
 
+@cached_reader("Freiburg")
 def freiburg():
-    path = data / "interim/csv/Freiburg"
-    dfs = []
-    for file in path.glob("*.csv"):
-        df = pd.read_csv(file)
-        df = df.rename(
-            columns={
-                "Datum": "event_date",
-                "Grund/Anlass": "topic",
-                "Ort bzw. Wegstrecke": "location",
-            },
-        )
-        dfs.append(df)
-    df = pd.concat(dfs)
-    df = df[["event_date", "topic", "location"]]
-    df["city"] = "Freiburg"
-    df["region"] = "Baden-Württemberg"
-    df["is_regional_capital"] = False
-    return df
+    return read_city(cities["Freiburg"])
 
 
 if __name__ == "__main__":
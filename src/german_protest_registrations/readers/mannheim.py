@@ -1,13 +1,16 @@
 import pandas as pd
 
+from german_protest_registrations.interim import read_interim
 from german_protest_registrations.paths import data
+from german_protest_registrations.reader_cache import cached_reader
 
 
+@cached_reader("Mannheim")
 def mannheim():
     path = data / "interim/csv/Mannheim"
     dfs = []
     for file in path.glob("*.csv"):
-        df = pd.read_csv(file)
+        df = read_interim(file)
         dfs.append(df)
     df = pd.concat(dfs)
     df["city"] = "Mannheim"
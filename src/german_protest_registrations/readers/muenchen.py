@@ -1,8 +1,67 @@
+import numpy as np
 import pandas as pd
+from openpyxl.cell.cell import TYPE_ERROR, TYPE_NUMERIC
+from openpyxl.styles import DEFAULT_FONT
+from pandas.io.parsers import TextParser
 
 from german_protest_registrations.paths import data
+from german_protest_registrations.reader_cache import cached_reader
 
 
+def _convert_cell(cell):
+    # same conversion as pandas' openpyxl reader
+    if cell.value is None:
+        return ""
+    if cell.data_type == TYPE_ERROR:
+        return np.nan
+    if cell.data_type == TYPE_NUMERIC:
+        value = int(cell.value)
+        return value if value == cell.value else float(cell.value)
+    return cell.value
+
+
+def _is_coloured(font) -> bool:
+    return isinstance(getattr(getattr(font, "color", None), "rgb", None), str)
+
+
+def _default_font(wb):
+    """The font of the cells that have no style of their own: the first font of the workbook.
+
+    openpyxl has no public accessor for it; `_fonts` is checked against openpyxl 3.1.5, and
+    openpyxl's own default font is used if the attribute is missing.
+    """
+    fonts = getattr(wb, "_fonts", None)
+    return fonts[0] if fonts else DEFAULT_FONT
+
+
+def read_sheet(sheet, skiprows: int, default_font) -> pd.DataFrame:
+    """Read a sheet like `pd.read_excel`, with a `cancelled` column from the font colours.
+
+    The values and the font colour of column A are taken from a single pass over the rows.
+    """
+    # as in pandas, ignore the declared dimensions, which are often far too large
+    sheet.reset_dimensions()
+    rows, coloured = [], []
+    for row in sheet.iter_rows():
+        values = [_convert_cell(cell) for cell in row]
+        while values and values[-1] == "":
+            values.pop()
+        rows.append(values)
+        # cells missing from the file have the default font
+        font = getattr(row[0], "font", default_font) if row else default_font
+        coloured.append(_is_coloured(font or default_font))
+    while rows and not rows[-1]:
+        rows.pop()
+    width = max(map(len, rows), default=0)
+    rows = [values + [""] * (width - len(values)) for values in rows]
+    df = TextParser(rows, header=0, skiprows=skiprows, skip_blank_lines=False).read()
+    # the colours are read from the fourth row on, regardless of `skiprows`
+    coloured += [_is_coloured(default_font)] * (3 + len(df) - len(coloured))
+    df["cancelled"] = coloured[3 : 3 + len(df)]
+    return df
+
+
+@cached_reader("München")
 def muenchen():
     # red color means cancelled event
 
@@ -13,18 +72,13 @@ def muenchen():
 
     # Process all XLSX files in the directory (2022.xlsx, 2023_2023.xlsx, etc.)
     for xlsx_path in sorted(base_path.glob("*.xlsx")):
-        wb = load_workbook(xlsx_path, data_only=True)
+        wb = load_workbook(xlsx_path, read_only=True, data_only=True, keep_links=False)
 
         # 2023 file has different header structure (needs 5 rows skipped instead of 2)
         skiprows = 5 if '2023' in xlsx_path.name else 2
 
         for sheet in wb.worksheets:
-            df = pd.read_excel(
-                xlsx_path,
-                sheet_name=sheet.title,
-                engine="openpyxl",
-                skiprows=skiprows,
-            )
+            df = read_sheet(sheet, skiprows, default_font=_default_font(wb))
             df = df.rename(
                 columns={
                     "Datum": "event_date",
@@ -36,13 +90,8 @@ def muenchen():
                     "angezeigte Teilnehmerzahl": "participants_registered",
                 },
             )
-            cancelled = pd.Series([
-                isinstance(getattr(cell.font.color, 'rgb', None), str)
-                for cell in sheet["A:A"][3:]
-            ])
-            df_ = df[~cancelled]
-            # print(len(df), len(df_))
-            dfs.append(df_)
+            dfs.append(df[~df["cancelled"]])
+        wb.close()
 
     df = pd.concat(dfs)
     df = df[["event_date", "organizer", "topic", "location", "participants_registered"]]
@@ -1,28 +1,10 @@
-import pandas as pd
-
-from german_protest_registrations.paths import data
+from german_protest_registrations.reader_cache import cached_reader
+from german_protest_registrations.readers.registry import cities, read_city
 
 
+@cached_reader("Potsdam")
 def potsdam():
-    path = data / "interim/csv/Potsdam"
-    dfs = []
-    for file in path.glob("*.csv"):
-        df = pd.read_csv(file)
-        df.columns = [
-            "event_date",
-            "event_time",
-            "city",
-            "topic",
-            "participants_registered",
-            "location",
-        ]
-        dfs.append(df)
-    df = pd.concat(dfs)
-    df = df[["event_date", "topic", "location", "participants_registered"]]
-    df["city"] = "Potsdam"
-    df["region"] = "Brandenburg"
-    df["is_regional_capital"] = True
-    return df
+    return read_city(cities["Potsdam"])
 
 
 if __name__ == "__main__":
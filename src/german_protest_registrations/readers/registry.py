@@ -0,0 +1,364 @@
+"""Declarative descriptions of the city data sets, and the engine that reads them.
+
+Most cities only differ in where their interim tables are, how their columns are named, and
+which rows and files to skip. They are described by a `CitySpec` in `cities` and read by
+`read_city`. Cities whose data needs more than that (Berlin, München, Saarbrücken) have their
+own reader functions.
+"""
+
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import pandas as pd
+
+from german_protest_registrations.interim import read_interim
+from german_protest_registrations.paths import data
+
+
+@dataclass(frozen=True)
+class CitySpec:
+    """How to read the interim tables of a city.
+
+    Every file in `data/interim/csv/<city>` is read with `skiprows` (or `skiprows[file name]`),
+    the first `drop_rows` rows are dropped, and the columns are renamed by `aliases` (or named
+    by `names`). Unless `columns` is None or `names` is given, only the columns named in
+    `aliases` or `columns` are read, as strings. With `require_date`, files without an
+    `event_date` column (such as template sheets) are skipped. `clean` is applied to each table,
+    rows where all the `dropna` columns are missing are dropped, and the table is reduced to
+    those of `columns` that exist (all columns if `columns` is None). The tables are then
+    concatenated, and duplicates in the `deduplicate` columns are dropped.
+
+    `date_formats` are the formats that the dates of the city are expected in. `unify` parses
+    the dates with them before falling back to its generic rules, so they must give the same
+    dates as those (see `unify.date_formats`).
+    """
+
+    city: str
+    region: str
+    is_regional_capital: bool
+    date_formats: list[str] = field(default_factory=list)
+    aliases: dict[str, str] = field(default_factory=dict)
+    names: list[str] | None = None
+    columns: list[str] | None = None
+    skiprows: int | dict[str, int] = 0
+    drop_rows: int = 0
+    exclude: list[str] = field(default_factory=list)
+    require_date: bool = False
+    dropna: list[str] = field(default_factory=list)
+    deduplicate: list[str] = field(default_factory=list)
+    clean: Callable[[pd.DataFrame, Path], pd.DataFrame] | None = None
+
+
+def usecols(spec: CitySpec) -> set[str] | None:
+    """The raw columns needed for the output columns of a city, or None for all columns."""
+    if spec.columns is None or spec.names is not None:
+        return None
+    return set(spec.aliases) | set(spec.columns)
+
+
+def read_table(spec: CitySpec, file: Path) -> pd.DataFrame | None:
+    """Read and normalise a single interim table of a city."""
+    skiprows = spec.skiprows.get(file.name, 0) if isinstance(spec.skiprows, dict) else spec.skiprows
+    df = read_interim(file, skiprows=skiprows, usecols=usecols(spec))
+    df = df.iloc[spec.drop_rows :]
+    if spec.names is not None:
+        df.columns = spec.names
+    df = df.rename(columns=spec.aliases)
+    if spec.require_date and "event_date" not in df.columns:
+        return None
+    if spec.clean is not None:
+        df = spec.clean(df, file)
+    if spec.dropna:
+        df = df.dropna(subset=spec.dropna, how="all")
+    if spec.columns is not None:
+        df = df[[column for column in spec.columns if column in df.columns]]
+    return df
+
+
+def read_city(spec: CitySpec) -> pd.DataFrame:
+    """Read all interim tables of a city into a single DataFrame."""
+    path = data / "interim/csv" / spec.city
+    files = [file for file in path.glob("*.csv") if file.name not in spec.exclude]
+    dfs = [df for df in (read_table(spec, file) for file in files) if df is not None]
+    df = pd.concat(dfs)
+    if spec.deduplicate:
+        df = df.drop_duplicates(subset=spec.deduplicate, keep="last")
+    df["city"] = spec.city
+    df["region"] = spec.region
+    df["is_regional_capital"] = spec.is_regional_capital
+    return df
+
+
+def _remove_nv(df: pd.DataFrame, file: Path) -> pd.DataFrame:
+    df["event_date"] = df["event_date"].str.replace("NV", "")
+    if "event_date_end" in df.columns:
+        df["event_date_end"] = df["event_date_end"].str.replace("NV", "")
+    return df
+
+
+def _remove_placeholder_dates(df: pd.DataFrame, file: Path) -> pd.DataFrame:
+    df["event_date"] = df["event_date"].str.replace(r"^\s*(-|\?)+\s*$", "", regex=True)
+    return df
+
+
+def _remove_cancelled(df: pd.DataFrame, file: Path) -> pd.DataFrame:
+    if "cancelled" in df.columns:
+        df = df[df["cancelled"] != "x"]
+    return df
+
+
+def _add_year_2023(df: pd.DataFrame, file: Path) -> pd.DataFrame:
+    # the 2023 file has dates without year (e.g., "02.01.")
+    if "2023" in file.name:
+        df["event_date"] = (
+            df["event_date"]
+            .astype(str)
+            .apply(lambda x: x + "2023" if x.endswith(".") and len(x) < 10 else x)
+        )
+    return df
+
+
+def _remove_empty_rows(df: pd.DataFrame, file: Path) -> pd.DataFrame:
+    return df.drop(columns=["Lfd Nr."], errors="ignore").dropna(how="all")
+
+
+cities = {
+    spec.city: spec
+    for spec in [
+        CitySpec(
+            city="Bremen",
+            region="Bremen",
+            is_regional_capital=True,
+            date_formats=["%Y-%m-%d", "%Y-%m-%d %H:%M:%S"],
+            aliases={
+                "Beginn": "event_date",
+                "Ende": "event_date_end",
+                "Datum": "event_date",  # 2023 column name
+                "Versammlungsthema": "topic",
+                "Thema/Motto": "topic",  # 2023 column name
+                "Ort": "location",
+            },
+            columns=["event_date", "topic", "location"],
+            clean=_remove_nv,
+        ),
+        CitySpec(
+            city="Dortmund",
+            region="Nordrhein-Westfalen",
+            is_regional_capital=False,
+            date_formats=["%Y-%m-%d %H:%M:%S", "%d.%m.%Y"],
+            aliases={
+                "Datum": "event_date",
+                "ang. TN-Zahl": "participants_registered",
+                "Ort": "location",
+                "Thema": "topic",  # 2023 column name
+            },
+            columns=["event_date", "topic", "participants_registered", "location"],
+        ),
+        CitySpec(
+            city="Dresden",
+            region="Sachsen",
+            is_regional_capital=True,
+            date_formats=["%Y-%m-%d"],
+            aliases={
+                "Datum von": "event_date",
+                "Thema": "topic",
+                "Ort (ausschließlich Dresden)": "location",
+                "Teilnehmerzahl Anmeldung": "participants_registered",
+            },
+        ),
+        CitySpec(
+            city="Duisburg",
+            region="Nordrhein-Westfalen",
+            is_regional_capital=False,
+            date_formats=["%Y-%m-%d", "%Y-%m-%d %H:%M:%S"],
+            aliases={
+                "Datum": "event_date",
+                "Thema": "topic",
+                "Ort, Aufzugsweg": "location",
+                "TN-Zahl": "participants_registered",
+                "TN-Zahl angezeigt": "participants_registered",  # 2023 column name
+            },
+            columns=["event_date", "topic", "location", "participants_registered"],
+            require_date=True,
+            clean=_remove_placeholder_dates,
+        ),
+        CitySpec(
+            city="Erfurt",
+            region="Thüringen",
+            is_regional_capital=True,
+            date_formats=["%Y-%m-%d %H:%M:%S", "%d.%m.%Y"],
+            aliases={
+                "Datum der Vers.": "event_date",
+                "Datum der Versammlung": "event_date",
+                "Datum der\nVersammlung": "event_date",
+                "Thema": "topic",
+                "Versammlungsort": "location",
+                "Ort der Versammlung / Aufzugsstrecke": "location",
+                "Ort der Versammlung / Aufzuggstrecke": "location",
+                "Ort d. Versammlung / Aufzugsstrecke": "location",
+                "Ort der Versammlung /": "location",
+                "Veranstalter/Vertreter": "organizer",
+                "Versammlungsanmelder": "organizer",
+                "Versammlungsmelder": "organizer",
+            },
+            columns=["event_date", "organizer", "topic", "location"],
+            dropna=["event_date", "organizer", "topic", "location"],
+        ),
+        CitySpec(
+            city="Freiburg",
+            region="Baden-Württemberg",
+            is_regional_capital=False,
+            date_formats=["%Y-%m-%d %H:%M:%S", "%d.%m.%Y"],
+            aliases={
+                "Datum": "event_date",
+                "Grund/Anlass": "topic",
+                "Ort bzw. Wegstrecke": "location",
+            },
+            columns=["event_date", "topic", "location"],
+        ),
+        CitySpec(
+            city="Karlsruhe",
+            region="Baden-Württemberg",
+            is_regional_capital=False,
+            date_formats=["%Y-%m-%d %H:%M:%S", "%d.%m.%Y"],
+            aliases={
+                "Datum": "event_date",
+                "Thema": "topic",
+                "Ort": "location",
+                "Teilnehmende": "participants_registered",
+                "Angemeldete Teilnehmerzahl": "participants_registered",  # 2023 column name
+                "Absage": "cancelled",
+            },
+            columns=["event_date", "topic", "location", "participants_registered"],
+            skiprows=1,
+            clean=_remove_cancelled,
+        ),
+        CitySpec(
+            city="Kiel",
+            region="Schleswig-Holstein",
+            is_regional_capital=True,
+            date_formats=["%Y-%m-%d %H:%M:%S", "%d.%m.%Y"],
+            aliases={
+                "Datum": "event_date",
+                "Thema": "topic",
+                "Standort": "location",
+                "Standort/Strecke": "location",  # 2023 column name
+                "Personenzahl": "participants_registered",
+            },
+            columns=["event_date", "topic", "location", "participants_registered"],
+            skiprows={"2022_2021.csv": 1},
+            exclude=["2022_2020.csv"],
+            clean=_add_year_2023,
+        ),
+        CitySpec(
+            city="Köln",
+            region="Nordrhein-Westfalen",
+            is_regional_capital=False,
+            date_formats=["%Y-%m-%d %H:%M:%S", "%d.%m.%Y"],
+            aliases={
+                "Datum": "event_date",
+                "Datum\n": "event_date",
+                "Thema": "topic",
+                "Ort(e) der Kundgebung": "location",
+                "Ort/e der Kundgebung": "location",
+                "Zahl der Teilnehm er / -\ninnen": "participants_registered",
+                "erwartete TN-Zahl\n": "participants_registered",
+            },
+            columns=["event_date", "topic", "location", "participants_registered"],
+        ),
+        CitySpec(
+            city="Magdeburg",
+            region="Sachsen-Anhalt",
+            is_regional_capital=True,
+            date_formats=["%Y-%m-%d %H:%M:%S", "%d.%m.%Y"],
+            aliases={
+                "Datum der Vers": "event_date",
+                "Thema der Versammlung": "topic",
+                "Ort der Vers": "location",
+                "Unnamed: 6": "participants_registered",  # TN angemeldet
+                "Unnamed: 7": "participants_actual",  # TN anwesend
+            },
+            columns=[
+                "event_date",
+                "topic",
+                "location",
+                "participants_registered",
+                "participants_actual",
+            ],
+            drop_rows=1,
+            deduplicate=["event_date", "topic", "location"],
+        ),
+        CitySpec(
+            city="Mainz",
+            region="Rheinland-Pfalz",
+            is_regional_capital=True,
+            date_formats=["%Y-%m-%d %H:%M:%S", "%d.%m.%Y"],
+            aliases={
+                "Datum": "event_date",
+                "Datum der Veranstaltung": "event_date",
+                "Datum\n": "event_date",
+                "Thema": "topic",
+                "Versammlungsort": "location",
+                "Erwartete TN": "participants_registered",
+            },
+            columns=["event_date", "topic", "location", "participants_registered"],
+            skiprows=2,
+            drop_rows=1,
+            clean=_remove_empty_rows,
+        ),
+        CitySpec(
+            city="Potsdam",
+            region="Brandenburg",
+            is_regional_capital=True,
+            date_formats=["%Y-%m-%d %H:%M:%S", "%d.%m.%Y"],
+            names=[
+                "event_date",
+                "event_time",
+                "city",
+                "topic",
+                "participants_registered",
+                "location",
+            ],
+            columns=["event_date", "topic", "location", "participants_registered"],
+        ),
+        CitySpec(
+            city="Wiesbaden",
+            region="Hessen",
+            is_regional_capital=True,
+            date_formats=["%Y-%m-%d %H:%M:%S", "%d.%m.%Y"],
+            aliases={
+                "Datum": "event_date",
+                "Organisation / verantwortliche Person": "organizer",
+                "Thema": "topic",
+                "Ort": "location",
+                "Teilnehmerzahl": "participants_registered",
+            },
+            columns=["event_date", "organizer", "topic", "location", "participants_registered"],
+            skiprows=2,
+            dropna=["event_date"],
+        ),
+        CitySpec(
+            city="Wuppertal",
+            region="Nordrhein-Westfalen",
+            is_regional_capital=False,
+            date_formats=["%d.%m.%Y"],
+            aliases={
+                "Datum": "event_date",
+                "Veranstalter": "organizer",
+                "Thema": "topic",
+                "Versammlungsort": "location",
+                "Teilnehmer": "participants_registered",
+            },
+            columns=["event_date", "organizer", "topic", "location", "participants_registered"],
+            dropna=["event_date"],
+        ),
+    ]
+}
+
+# expected date formats of all cities, including those with their own readers
+date_format_hints = {city: spec.date_formats for city, spec in cities.items()} | {
+    "Berlin": ["%d.%m.%Y"],
+    "München": ["%Y-%m-%d %H:%M:%S", "%d.%m.%Y"],
+    "Saarbrücken": ["%Y-%m-%d %H:%M:%S", "%d.%m.%Y"],
+}
@@ -1,8 +1,11 @@
 import pandas as pd
 
+from german_protest_registrations.interim import read_interim
 from german_protest_registrations.paths import data
+from german_protest_registrations.reader_cache import cached_reader
 
 
+@cached_reader("Saarbrücken")
 def saarbruecken():
     path = data / "interim/csv/Saarbrücken"
     dfs = []
@@ -11,7 +14,7 @@ def saarbruecken():
         "2022_2022 V+A.csv",
         "2022_2023 V+A.csv",
     ]:
-        df = pd.read_csv(path / filename)
+        df = read_interim(path / filename)
         df1 = df.iloc[:, :9]  # gatherings
         df1 = df1.rename(
             columns={
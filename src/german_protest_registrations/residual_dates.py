@@ -0,0 +1,61 @@
+"""Parse the date texts that no exact format matches, with dateparser.
+
+`dateparser.parse` configures a new parser for every text when it is given settings. Here,
+every worker process configures one `DateDataParser` and reuses it for its chunks of texts.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from time import perf_counter
+
+import pandas as pd
+from dateparser.date import DateDataParser
+
+dateparser_formats = ["%d.%m.%Y", "%Y-%m-%d %H:%M:%S"]
+dateparser_settings = {"STRICT_PARSING": True}
+# German alone would read two-digit years day first (e.g. "05.01.15" as January 5), where
+# detecting among all languages reads them month first; English and German reproduce the latter
+languages = ["en", "de"]
+chunk_size = 500
+
+_parser = None
+
+
+def _init_parser():
+    global _parser
+    _parser = DateDataParser(languages=languages, settings=dateparser_settings)
+
+
+def _parse_chunk(texts: list[str]) -> list:
+    if _parser is None:
+        _init_parser()
+    return [_parser.get_date_data(text, date_formats=dateparser_formats).date_obj for text in texts]
+
+
+def parse_residual_dates(texts: pd.Series, jobs: int = 0) -> pd.Series:
+    """Parse date texts with dateparser, each distinct text once.
+
+    The distinct texts are split into chunks of `chunk_size`. If there is more than one
+    chunk, they are parsed in a pool of `jobs` worker processes (0: all cores); otherwise,
+    or with `jobs` = 1, in this process. Dates out of the range of pandas timestamps are
+    left unparsed.
+    """
+    start = perf_counter()
+    unique = texts.unique().tolist()
+    chunks = [unique[i : i + chunk_size] for i in range(0, len(unique), chunk_size)]
+    if jobs == 1 or len(chunks) < 2:
+        results = list(map(_parse_chunk, chunks))
+    else:
+        with ProcessPoolExecutor(
+            max_workers=jobs or os.cpu_count(), initializer=_init_parser
+        ) as executor:
+            results = list(executor.map(_parse_chunk, chunks))
+    dates = dict(zip(unique, chain.from_iterable(results)))
+    seconds = perf_counter() - start
+    parsed = sum(date is not None for date in dates.values())
+    print(
+        f"Parsed {parsed} of {len(unique)} distinct texts with dateparser in {seconds:.2f}s "
+        f"({len(unique) / max(seconds, 1e-9):.0f} texts/s)"
+    )
+    return pd.to_datetime(texts.map(dates), errors="coerce")
@@ -0,0 +1,147 @@
+"""Report how much work each date and participant number rule in `unify` does.
+
+For every rule, the report lists how many rows it changed (or, for the parsing tiers, parsed),
+in which cities, and how long it took on the distinct texts. It is written to
+`data/interim/rule_report.json` and `data/interim/rule_report.md`.
+"""
+
+import json
+import re
+from functools import partial
+from time import perf_counter
+
+import pandas as pd
+
+from german_protest_registrations.paths import data
+from german_protest_registrations.unify import (
+    cancelled_dates,
+    date_format_hints,
+    date_formats,
+    date_rewrites,
+    parse_residual_dates,
+    participant_columns,
+    participant_rules,
+    participant_types,
+    process_dates,
+    read_dfs,
+)
+
+
+def _record(stage: str, rule: str, hits: pd.Series, cities: pd.Series, seconds: float) -> dict:
+    by_city = hits.groupby(cities).sum()
+    return {
+        "stage": stage,
+        "rule": rule,
+        "rows": int(hits.sum()),
+        "seconds": round(seconds, 4),
+        "cities": {city: int(n) for city, n in by_city[by_city > 0].items()},
+    }
+
+
+def apply_rules(stage: str, texts: pd.Series, cities: pd.Series, rules) -> tuple[pd.Series, list]:
+    """Apply text rules one after another, recording the rows that each one changed."""
+    records = []
+    for name, rule in rules:
+        codes, uniques = pd.factorize(texts)
+        start = perf_counter()
+        new = pd.Series(uniques).map(rule)
+        seconds = perf_counter() - start
+        new = pd.Series(new.to_numpy()[codes], index=texts.index)
+        records.append(_record(stage, name, new != texts, cities, seconds))
+        texts = new
+    return texts, records
+
+
+def apply_formats(stage: str, texts: pd.Series, cities: pd.Series, formats) -> tuple:
+    """Parse texts with exact formats one after another, recording the rows each one parsed."""
+    parsed = pd.Series(pd.NaT, index=texts.index, dtype="datetime64[ns]")
+    records = []
+    for name, in_scope, date_format in formats:
+        todo = in_scope & parsed.isna()
+        start = perf_counter()
+        parsed[todo] = pd.to_datetime(texts[todo], format=date_format, errors="coerce")
+        seconds = perf_counter() - start
+        records.append(_record(stage, name, todo & parsed.notna(), cities, seconds))
+    return parsed, records
+
+
+def date_report(df: pd.DataFrame) -> list[dict]:
+    """Replay the steps of `unify.parse_dates`, recording the work of each rule."""
+    df = df.dropna(subset=["event_date"])
+    texts, cities = df["event_date"].astype(str), df["city"]
+    empty = texts.str.len() == 0
+    cancelled = ~empty & texts.str.lower().str.contains(cancelled_dates, regex=True)
+    records = [
+        _record("date filters", "empty", empty, cities, 0),
+        _record("date filters", "cancelled or total", cancelled, cities, 0),
+    ]
+    texts, cities = texts[~empty & ~cancelled], cities[~empty & ~cancelled]
+
+    formats = [
+        (f"{city}: {date_format}", cities == city, date_format)
+        for city, city_formats in date_format_hints.items()
+        for date_format in city_formats
+    ]
+    parsed, city_records = apply_formats("city date formats", texts, cities, formats)
+    todo = parsed.isna()
+    texts, cities = texts[todo], cities[todo]
+
+    rules = [
+        (pattern, partial(re.compile(pattern).sub, replacement))
+        for pattern, replacement in date_rewrites
+    ]
+    texts, rewrite_records = apply_rules("date rewrites", texts, cities, rules)
+    formats = [(date_format, True, date_format) for date_format in date_formats]
+    parsed, format_records = apply_formats("date formats", texts, cities, formats)
+    todo = parsed.isna()
+    start = perf_counter()
+    parsed[todo] = parse_residual_dates(texts[todo])
+    seconds = perf_counter() - start
+    residual = [
+        _record("dateparser", "dateparser", todo & parsed.notna(), cities, seconds),
+        _record("dateparser", "unparsed", parsed.isna(), cities, 0),
+    ]
+    return records + city_records + rewrite_records + format_records + residual
+
+
+def participant_report(df: pd.DataFrame) -> list[dict]:
+    """Replay the steps of `unify.parse_participant_numbers`, recording the work of each rule."""
+    records = []
+    for column in participant_columns:
+        if column not in df.columns:
+            continue
+        texts, rule_records = apply_rules(
+            column, df[column].astype(str), df["city"], participant_rules
+        )
+        records += rule_records
+        kinds = texts
+        for name, pattern in participant_types:
+            kinds = kinds.map(partial(pattern.sub, name))
+        for name, _ in participant_types:
+            records.append(_record(column, f"type {name}", kinds == name, df["city"], 0))
+    return records
+
+
+def write_report(records: list[dict]):
+    with open(data / "interim/rule_report.json", "w") as f:
+        json.dump(records, f, indent=4, ensure_ascii=False)
+    lines = ["| stage | rule | rows | seconds | cities |", "|---|---|---|---|---|"]
+    for r in records:
+        cities = ", ".join(f"{city} ({n})" for city, n in r["cities"].items())
+        rule = r["rule"].replace("|", "\\|").replace("\n", "\\n")
+        lines.append(f"| {r['stage']} | `{rule}` | {r['rows']} | {r['seconds']} | {cities} |")
+    (data / "interim/rule_report.md").write_text("\n".join(lines) + "\n")
+
+
+def main(jobs: int = 1):
+    df = read_dfs(jobs=jobs)
+    records = date_report(df)
+    # the participant numbers are parsed for the rows that remain after the dates
+    records += participant_report(process_dates(df))
+    write_report(records)
+    for r in records:
+        print(f"{r['stage']:>24} {r['rows']:>7} rows {r['seconds']:>8.4f}s  {r['rule'][:60]!r}")
+
+
+if __name__ == "__main__":
+    main()
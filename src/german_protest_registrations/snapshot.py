@@ -0,0 +1,95 @@
+"""A snapshot of the unified dataset as an Arrow IPC file, for the report and the notebooks.
+
+The snapshot is written by `unify.get_all_datasets`. It is stored uncompressed, so that
+`load_snapshot` can memory-map it: it opens in milliseconds, and with `zero_copy` the columns
+of the DataFrame point into the mapped file, whose pages are shared by all processes that
+load it. The snapshot keeps a fingerprint of the sizes and modification times of the data and
+code it was built from, and is built again when they have changed since. The fingerprint only
+takes a `stat` of each file, so that checking it does not import or hash the pipeline.
+"""
+
+import hashlib
+from importlib.metadata import version
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+
+from german_protest_registrations import corrections, reader_cache
+from german_protest_registrations.paths import data
+
+snapshot_file = data / "interim/unified.arrow"
+
+
+def inputs() -> list[Path]:
+    """The data files and folders and the code that the unified dataset is built from (see
+    `unify.pipeline_inputs` and `unify.pipeline_modules`)."""
+    return [
+        *(data / folder for folder in reader_cache.folders),
+        data / "interim/coverage.csv",
+        corrections.date_corrections_file,
+        corrections.participant_corrections_file,
+        Path(__file__).parent,
+    ]
+
+
+def current_fingerprint() -> str:
+    """Hash of the paths, sizes and modification times of the inputs, and of the versions of the
+    libraries that parse the dates."""
+    h = hashlib.sha256()
+    for path in inputs():
+        files = sorted(path.rglob("*")) if path.is_dir() else [path]
+        for file in files:
+            if file.is_file() and file.suffix != ".pyc":
+                stat = file.stat()
+                h.update(f"{file.as_posix()}\0{stat.st_size}\0{stat.st_mtime_ns}\0".encode())
+    h.update(f"{pd.__version__}\0{version('dateparser')}".encode())
+    return h.hexdigest()[:16]
+
+
+def snapshot_fingerprint(file=snapshot_file) -> str | None:
+    """The fingerprint that the snapshot was built with, or None if there is none."""
+    if not file.exists():
+        return None
+    with pa.memory_map(str(file)) as source:
+        value = (pa.ipc.open_file(source).schema.metadata or {}).get(b"fingerprint")
+    return None if value is None else value.decode()
+
+
+def write_snapshot(df: pd.DataFrame, file=snapshot_file, fingerprint: str | None = None):
+    """Write the unified dataset to the snapshot, with the `fingerprint` of the inputs it was
+    built from (by default, of the current ones). Text columns that also hold numbers or dates
+    are stored as text."""
+    if fingerprint is None:
+        fingerprint = current_fingerprint()
+    text = {
+        column: df[column].where(df[column].isna(), df[column].astype(str))
+        for column in df.select_dtypes(object)
+    }
+    table = pa.Table.from_pandas(df.assign(**text))
+    table = table.replace_schema_metadata({**table.schema.metadata, b"fingerprint": fingerprint})
+    tmp = file.with_name(file.name + ".tmp")
+    with pa.OSFile(str(tmp), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    tmp.replace(file)
+
+
+def load_snapshot(columns=None, zero_copy: bool = False, file=snapshot_file) -> pd.DataFrame:
+    """Load the unified dataset from the snapshot, building it first if there is none or if it
+    is out of date.
+
+    With `zero_copy`, the columns are backed by the memory-mapped Arrow data (`pd.ArrowDtype`)
+    instead of being copied to NumPy arrays. Note that missing values then propagate as `NA`,
+    e.g. the mean of only missing values is `NA` rather than NaN.
+    """
+    current = current_fingerprint()
+    if snapshot_fingerprint(file) != current:
+        from german_protest_registrations.unify import get_unified_dataset
+
+        write_snapshot(get_unified_dataset(), file, current)
+    # the table keeps the mapping open for as long as its columns are used
+    table = pa.ipc.open_file(pa.memory_map(str(file))).read_all()
+    if columns is not None:
+        index = table.schema.pandas_metadata["index_columns"]
+        table = table.select(list(columns) + [i for i in index if isinstance(i, str)])
+    return table.to_pandas(types_mapper=pd.ArrowDtype if zero_copy else None)
@@ -0,0 +1,212 @@
+"""Cache the results of pipeline stages as Parquet files.
+
+A stage result is stored under a key that is computed from the contents of the stage's input
+files, the source code of the modules it depends on and its parameters, rather than by
+pickling and hashing the DataFrames it is called with. The cache in `.cache/stages` of the
+project folder is limited to `max_size` bytes; when it grows larger, the least recently used
+results are removed. Set `verbose` to print a line for every hit and miss.
+"""
+
+import hashlib
+import inspect
+import os
+import pickle
+import shutil
+from collections import Counter
+from functools import wraps
+from pathlib import Path
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+
+from german_protest_registrations.paths import _root
+
+cache_dir = _root / ".cache" / "stages"
+max_size = 2**30
+verbose = False
+stats = Counter()
+
+
+def _digest(file: Path) -> bytes:
+    sha256 = hashlib.sha256()
+    with file.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            sha256.update(chunk)
+    return sha256.digest()
+
+
+def files_hash(paths: list[Path]) -> str:
+    """Hash of the relative paths and contents of the given files and of all files in the given
+    folders. Missing paths are skipped."""
+    h = hashlib.sha256()
+    for path in paths:
+        files = sorted(path.rglob("*")) if path.is_dir() else [path]
+        for file in files:
+            if file.is_file():
+                h.update(file.relative_to(path.parent).as_posix().encode() + b"\0")
+                h.update(_digest(file))
+    return h.hexdigest()
+
+
+def source_hash(modules: list) -> str:
+    """Hash of the source code of the given modules."""
+    names = sorted({module.__name__ for module in modules})
+    modules = {module.__name__: module for module in modules}
+    source = "".join(inspect.getsource(modules[name]) for name in names)
+    return hashlib.sha256(source.encode()).hexdigest()
+
+
+def _is_text(column: pd.Series) -> bool:
+    # object columns of strings with NaN for missing values survive a Parquet round trip
+    values = column.to_numpy()
+    missing = pd.isna(values)
+    return all(isinstance(value, str) for value in values[~missing]) and all(
+        isinstance(value, float) for value in values[missing]
+    )
+
+
+def write_frame(df: pd.DataFrame, path: Path):
+    """Write a DataFrame to `<path>.parquet`, and the object columns with values other than
+    strings to `<path>.pkl`, along with the order and types of the columns and `attrs`."""
+    mixed = [column for column in df.select_dtypes(object) if not _is_text(df[column])]
+    df.drop(columns=mixed).to_parquet(path.with_suffix(".parquet"))
+    with open(path.with_suffix(".pkl"), "wb") as f:
+        pickle.dump((df.dtypes, df[mixed], df.attrs), f)
+
+
+def read_frame(path: Path) -> pd.DataFrame:
+    """Read a DataFrame written by `write_frame`."""
+    df = pd.read_parquet(path.with_suffix(".parquet"))
+    with open(path.with_suffix(".pkl"), "rb") as f:
+        dtypes, mixed, attrs = pickle.load(f)
+    for column in df.select_dtypes(object):
+        values = df[column].to_numpy(copy=True)
+        values[pd.isna(values)] = np.nan
+        df[column] = values
+    # Parquet has no timestamps in seconds
+    for column in df.columns[df.dtypes != dtypes[df.columns]]:
+        df[column] = df[column].astype(dtypes[column])
+    for column in mixed.columns:
+        df[column] = mixed[column].to_numpy()
+    df = df[dtypes.index]
+    df.attrs = attrs
+    return df
+
+
+def _file_size(file: Path) -> int:
+    # files can be renamed or removed by other processes while they are counted
+    try:
+        return file.stat().st_size if file.is_file() else 0
+    except FileNotFoundError:
+        return 0
+
+
+def _size(path: Path) -> int:
+    # the size of a file, or of all files in a folder
+    try:
+        files = list(path.rglob("*")) if path.is_dir() else [path]
+    except FileNotFoundError:
+        return 0
+    return sum(map(_file_size, files))
+
+
+def _entries() -> list[tuple[float, Path]]:
+    # the finished results with their time of last use; the `.tmp` folders that other processes
+    # are still writing are left alone
+    entries = []
+    for entry in cache_dir.iterdir() if cache_dir.exists() else []:
+        if entry.suffix == ".tmp":
+            continue
+        try:
+            entries.append((entry.stat().st_mtime, entry))
+        except FileNotFoundError:
+            pass
+    return sorted(entries)
+
+
+def evict(keep: Path | None = None):
+    """Remove the least recently used results until the cache is at most `max_size` bytes."""
+    entries = [entry for _, entry in _entries()]
+    size = sum(map(_size, entries))
+    for entry in entries:
+        if size <= max_size:
+            break
+        if entry != keep:
+            size -= _size(entry)
+            shutil.rmtree(entry, ignore_errors=True)
+            stats["evictions"] += 1
+
+
+def stage(inputs, modules, version=None, ignore: tuple[str, ...] = ()):
+    """Cache a function that returns a DataFrame or a tuple of DataFrames.
+
+    `inputs` and `modules` are called with the parameters of the stage, and give the files and
+    folders it reads and the modules whose code it runs. `version` optionally gives a version
+    string of anything else it depends on. Parameters listed in `ignore` are not part of the key.
+    """
+
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        def stage_key(*args, **kwargs) -> str:
+            params = signature.bind(*args, **kwargs)
+            params.apply_defaults()
+            params = {k: v for k, v in params.arguments.items() if k not in ignore}
+            key = (
+                params,
+                files_hash(inputs(**params)),
+                source_hash(modules(**params)),
+                version and version(),
+            )
+            return hashlib.sha256(repr(key).encode()).hexdigest()[:16]
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = stage_key(*args, **kwargs)
+            entry = cache_dir / f"{func.__name__}-{key}"
+            if entry.exists():
+                try:
+                    os.utime(entry)
+                    parts = [read_frame(file) for file in sorted(entry.glob("*.parquet"))]
+                    single = (entry / "frame.parquet").exists()
+                except FileNotFoundError:
+                    pass  # evicted by another process while it was read
+                else:
+                    stats["hits"] += 1
+                    if verbose:
+                        print(f"Stage cache hit for {func.__name__} ({key})")
+                    return parts[0] if single else tuple(parts)
+            stats["misses"] += 1
+            start = perf_counter()
+            result = func(*args, **kwargs)
+            if verbose:
+                print(
+                    f"Stage cache miss for {func.__name__} ({key}), computed in "
+                    f"{perf_counter() - start:.1f}s"
+                )
+            # each process writes to its own folder and renames it when it is complete
+            tmp = entry.with_name(f"{entry.name}.{os.getpid()}.tmp")
+            shutil.rmtree(tmp, ignore_errors=True)
+            tmp.mkdir(parents=True)
+            if isinstance(result, pd.DataFrame):
+                write_frame(result, tmp / "frame")
+            else:
+                for i, df in enumerate(result):
+                    write_frame(df, tmp / f"part-{i:02d}")
+            try:
+                tmp.rename(entry)
+            except OSError:
+                shutil.rmtree(tmp, ignore_errors=True)  # another process stored it first
+            evict(keep=entry)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def cache_report() -> dict:
+    """Hits, misses and evictions in this process, and the size of the cache in bytes."""
+    entries = [entry for _, entry in _entries()]
+    return {**stats, "entries": len(entries), "bytes": sum(map(_size, entries))}
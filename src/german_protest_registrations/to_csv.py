@@ -1,46 +1,262 @@
 """Create the `cleaned` directory."""
 
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import resource
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import partial
+from itertools import islice
 from pathlib import Path
+from time import perf_counter
 
 import pandas as pd
+from openpyxl import load_workbook
+from openpyxl.cell.cell import ERROR_CODES
 
+from german_protest_registrations.interim import header_names, parquet_path, to_parquet
+from german_protest_registrations.stage_cache import files_hash
 
-def main():
-    """Read all files from data/tabular."""
-    for file in Path("data/raw").glob("*/*"):
-        table_formats = [".csv", ".tsv", ".xlsx", ".xls", ".ods"]
-        print(file.absolute())
-        if file.suffix in table_formats:
-            match file.suffix:
-                case ".csv":
-                    # detect which delimiter is used
-                    delimiter = None
-                    with file.open() as f:
-                        first_line = f.readline()
-                        if "\t" in first_line:
-                            delimiter = "\t"
-                        elif ";" in first_line:
-                            delimiter = ";"
-                        elif "," in first_line:
-                            delimiter = ","
-                    if delimiter is None:
-                        raise ValueError(f"Could not detect delimiter for {file}")
-                    dfs = {file.stem: pd.read_csv(file, delimiter=delimiter)}
-                case ".tsv":
-                    dfs = {file.stem: pd.read_csv(file, delimiter="\t")}
-                case ".xlsx" | ".xls":
-                    dfs = pd.read_excel(file, sheet_name=None)
-                    dfs = {f"{file.stem}_{k}": v for k, v in dfs.items()}
-                case ".ods":
-                    dfs = pd.read_excel(file, engine="odf", sheet_name=None)
-                    dfs = {f"{file.stem}_{k}": v for k, v in dfs.items()}
-            for name, df in dfs.items():
-                if len(df) == 0:
-                    continue
-                folder = Path("data/interim/csv") / file.parent.stem
-                folder.mkdir(parents=True, exist_ok=True)
-                df.to_csv(folder / f"{name}.csv", index=False)
+table_formats = [".csv", ".tsv", ".xlsx", ".xls", ".ods"]
+manifest_path = Path("data/interim/manifest.json")
+
+
+def read_tables(file: Path) -> dict[str, pd.DataFrame]:
+    """Read all tables (sheets) from a raw file."""
+    match file.suffix:
+        case ".csv":
+            # detect which delimiter is used
+            delimiter = None
+            with file.open() as f:
+                first_line = f.readline()
+                if "\t" in first_line:
+                    delimiter = "\t"
+                elif ";" in first_line:
+                    delimiter = ";"
+                elif "," in first_line:
+                    delimiter = ","
+            if delimiter is None:
+                raise ValueError(f"Could not detect delimiter for {file}")
+            dfs = {file.stem: pd.read_csv(file, delimiter=delimiter)}
+        case ".tsv":
+            dfs = {file.stem: pd.read_csv(file, delimiter="\t")}
+        case ".xlsx" | ".xls":
+            dfs = pd.read_excel(file, sheet_name=None)
+            dfs = {f"{file.stem}_{k}": v for k, v in dfs.items()}
+        case ".ods":
+            dfs = pd.read_excel(file, engine="odf", sheet_name=None)
+            dfs = {f"{file.stem}_{k}": v for k, v in dfs.items()}
+    return dfs
+
+
+def _format_cell(value) -> str | int | float:
+    # mirror how pandas reads cells (errors are missing, integral numbers are ints)
+    if value is None or value in ERROR_CODES:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, datetime):
+        return str(value)
+    return value
+
+
+def stream_sheets(file: Path, folder: Path) -> dict[Path, Path]:
+    """Convert the sheets of an xlsx file to CSV row by row, with bounded memory.
+
+    Each sheet is iterated twice in openpyxl's read-only mode: once to find the extent of the
+    table (pandas drops trailing empty rows and columns), and once to write it. Unlike
+    `read_tables`, the values are not typed column by column, so e.g. whole numbers in columns
+    with gaps are written as "12" rather than "12.0", and numeric text keeps its formatting.
+
+    Returns the temporary files by output path.
+    """
+    wb = load_workbook(file, read_only=True, data_only=True)
+    outputs = {}
+    try:
+        for sheet in wb.worksheets:
+            # as in pandas, ignore the declared dimensions, which are often far too large
+            sheet.reset_dimensions()
+            width, height = 0, 0
+            for i, row in enumerate(sheet.iter_rows(values_only=True)):
+                for j in range(len(row) - 1, -1, -1):
+                    # error cells count as data, as in pandas
+                    if row[j] is not None and row[j] != "":
+                        width, height = max(width, j + 1), i + 1
+                        break
+            if height < 2:
+                continue
+            path = folder / f"{file.stem}_{sheet.title}.csv"
+            partial_path = path.with_name(f"{path.name}.partial")
+            folder.mkdir(parents=True, exist_ok=True)
+            with partial_path.open("w", encoding="utf-8", newline="") as f:
+                writer = csv.writer(f, lineterminator="\n")
+                rows = sheet.iter_rows(values_only=True)
+                padding = ("",) * width
+                header = (*next(rows), *padding)[:width]
+                writer.writerow(header_names(_format_cell(value) for value in header))
+                for row in islice(rows, height - 1):
+                    writer.writerow((*map(_format_cell, row), *padding)[:width])
+            outputs[path] = partial_path
+    finally:
+        wb.close()
+    return outputs
+
+
+def peak_rss() -> float:
+    """Peak resident set size of the current process in MB.
+
+    In a forked process, this includes the memory of the parent at the time of the fork.
+    """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def convert_file(
+    file: Path, parquet: bool = False, stream: bool = False
+) -> tuple[dict[Path, str | bytes | Path], float, float]:
+    """Render every non-empty table of a raw file as CSV text, and optionally as Parquet.
+
+    With `stream`, xlsx files are instead written to temporary files by `stream_sheets`.
+
+    Returns the file contents (or temporary files) by output path, the wall time in seconds,
+    and how much the peak RSS of the process grew during the conversion, in MB.
+    """
+    start = perf_counter()
+    start_rss = peak_rss()
+    folder = Path("data/interim/csv") / file.parent.stem
+    if stream and file.suffix == ".xlsx":
+        return stream_sheets(file, folder), perf_counter() - start, peak_rss() - start_rss
+    outputs = {
+        folder / f"{name}.csv": df.to_csv(index=False)
+        for name, df in read_tables(file).items()
+        if len(df) > 0
+    }
+    if parquet:
+        outputs |= {parquet_path(path): to_parquet(text) for path, text in outputs.items()}
+    return outputs, perf_counter() - start, peak_rss() - start_rss
+
+
+def write_outputs(outputs: dict[Path, str | bytes | Path]):
+    for path, content in outputs.items():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if isinstance(content, Path):
+            os.replace(content, path)
+        elif isinstance(content, bytes):
+            path.write_bytes(content)
+        else:
+            with path.open("w", encoding="utf-8", newline="") as f:
+                f.write(content)
+
+
+def load_manifest() -> dict[str, dict]:
+    """Load the content hashes and outputs of the previously converted raw files."""
+    if not manifest_path.exists():
+        return {}
+    with manifest_path.open() as f:
+        return json.load(f)
+
+
+def main(jobs: int = 1, force: bool = False, parquet: bool = False, stream: bool = False):
+    """Read all files from data/tabular.
+
+    Only cities with new, changed, removed or missing files are converted again; the
+    content hashes and outputs of all raw files are kept in `data/interim/manifest.json`.
+    A whole city is converted at once so that files with colliding output names
+    (e.g. München's 2022.ods and 2022.xlsx) resolve as in a full conversion, and outputs
+    whose source is gone are deleted. With `force`, everything is converted again.
+
+    With `parquet`, every table is also written to `data/interim/parquet`, which the
+    readers then load instead of the CSV files (see `interim.read_interim`).
+
+    With `jobs` > 1, the files are parsed in a pool of worker processes. The outputs are
+    still written in the same order as in the serial case.
+
+    For every file, the growth of the peak RSS of the converting process is reported: the
+    memory the conversion needed beyond what the process had used before. In a process that
+    converts several files, this is zero for any file that needs less than an earlier one.
+    With `stream`, xlsx files are converted row by row (see `stream_sheets`), and every file
+    is converted in a fresh, spawned (not forked) worker process, so that the number is the
+    memory of that file's conversion alone.
+    """
+    if stream and parquet:
+        raise ValueError("Streamed conversion cannot write Parquet tables")
+    total = perf_counter()
+    files = [file for file in Path("data/raw").glob("*/*") if file.suffix in table_formats]
+    old_manifest = {} if force else load_manifest()
+    manifest = {}
+    stale_cities = set()
+    for file in files:
+        old = old_manifest.get(file.as_posix(), {"outputs": []})
+        stat = file.stat()
+        if (old.get("size"), old.get("mtime_ns")) == (stat.st_size, stat.st_mtime_ns):
+            sha256 = old["sha256"]
+        else:
+            sha256 = files_hash([file])
+        manifest[file.as_posix()] = {
+            "sha256": sha256,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "outputs": old["outputs"],
+        }
+        outputs = [Path(p) for p in old["outputs"]]
+        if parquet:
+            outputs += [parquet_path(p) for p in outputs if p.suffix == ".csv"]
+        if sha256 != old.get("sha256") or not all(p.exists() for p in outputs):
+            stale_cities.add(file.parent.stem)
+    for source in old_manifest.keys() - manifest.keys():
+        stale_cities.add(Path(source).parent.stem)
+    files = [file for file in files if file.parent.stem in stale_cities]
+
+    convert = partial(convert_file, parquet=parquet, stream=stream)
+    executor = None
+    if jobs == 1 and not stream:
+        results = map(convert, files)
+    else:
+        executor = ProcessPoolExecutor(
+            max_workers=jobs or os.cpu_count(),
+            mp_context=multiprocessing.get_context("spawn") if stream else None,
+            max_tasks_per_child=1 if stream else None,
+        )
+        results = executor.map(convert, files)
+    for file, (outputs, seconds, rss) in zip(files, results):
+        print(f"{file.absolute()} ({seconds:.2f}s, peak RSS +{rss:.0f} MB)")
+        write_outputs(outputs)
+        manifest[file.as_posix()]["outputs"] = sorted(p.as_posix() for p in outputs)
+    if executor:
+        executor.shutdown()
+
+    produced = {p for entry in manifest.values() for p in entry["outputs"]}
+    for entry in old_manifest.values():
+        for output in set(entry["outputs"]) - produced:
+            print(f"Removing {output}")
+            Path(output).unlink(missing_ok=True)
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    with manifest_path.open("w") as f:
+        json.dump(manifest, f, indent=4, ensure_ascii=False)
+    print(
+        f"Converted {len(files)} of {len(manifest)} files in {perf_counter() - total:.2f}s "
+        f"({len(manifest) - len(files)} unchanged)"
+    )
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=1, help="number of worker processes (0: all cores)"
+    )
+    parser.add_argument(
+        "-f", "--force", action="store_true", help="convert all files, ignoring the manifest"
+    )
+    parser.add_argument(
+        "--parquet", action="store_true", help="also write the tables to data/interim/parquet"
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="convert xlsx files row by row with bounded memory, each file in a fresh process, "
+        "so that the reported growth of the peak RSS is that of the file's conversion",
+    )
+    args = parser.parse_args()
+    main(jobs=args.jobs, force=args.force, parquet=args.parquet, stream=args.stream)
@@ -1,14 +1,27 @@
+import hashlib
+import inspect
 import json
+import os
 import re
+import sys
 import warnings
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from operator import call
+from pathlib import Path
 
+import dateparser
+import numpy as np
 import pandas as pd
-import swifter
-from dateparser import parse
-from joblib import Memory
+from diskcache import Cache
 from tqdm.auto import tqdm
 
+from german_protest_registrations import corrections, interim, reader_cache, residual_dates
+from german_protest_registrations.corrections import date_corrections, participant_corrections
+from german_protest_registrations.dataset import variants
+from german_protest_registrations.export import export_datasets
 from german_protest_registrations.paths import data
+from german_protest_registrations.readers import registry
 from german_protest_registrations.readers.augsburg import augsburg
 from german_protest_registrations.readers.berlin import berlin
 from german_protest_registrations.readers.bremen import bremen
@@ -25,43 +38,148 @@ from german_protest_registrations.readers.mainz import mainz
 from german_protest_registrations.readers.mannheim import mannheim
 from german_protest_registrations.readers.muenchen import muenchen
 from german_protest_registrations.readers.potsdam import potsdam
+from german_protest_registrations.readers.registry import date_format_hints
 from german_protest_registrations.readers.saarbruecken import saarbruecken
 from german_protest_registrations.readers.wiesbaden import wiesbaden
 from german_protest_registrations.readers.wuppertal import wuppertal
+from german_protest_registrations.residual_dates import (
+    dateparser_formats,
+    dateparser_settings,
+    languages,
+    parse_residual_dates,
+)
+from german_protest_registrations.snapshot import current_fingerprint, write_snapshot
+from german_protest_registrations.stage_cache import stage
 
 warnings.filterwarnings("ignore", module="dateparser")
-cache = Memory(".cache", verbose=0).cache
-_ = swifter  # just so it doesn't get dropped from the imports
-
-
-def read_dfs() -> pd.DataFrame:
-    df_readers = [
-        augsburg,
-        berlin,
-        bremen,
-        dortmund,
-        dresden,
-        duisburg,
-        erfurt,
-        freiburg,
-        karlsruhe,
-        kiel,
-        koeln,
-        magdeburg,
-        mainz,
-        mannheim,
-        muenchen,
-        potsdam,
-        saarbruecken,
-        wiesbaden,
-        wuppertal,
-    ]
-    dfs = {read.__name__: read() for read in tqdm(df_readers, mininterval=1)}
+
+
+df_readers = [
+    augsburg,
+    berlin,
+    bremen,
+    dortmund,
+    dresden,
+    duisburg,
+    erfurt,
+    freiburg,
+    karlsruhe,
+    kiel,
+    koeln,
+    magdeburg,
+    mainz,
+    mannheim,
+    muenchen,
+    potsdam,
+    saarbruecken,
+    wiesbaden,
+    wuppertal,
+]
+
+
+def read_dfs(jobs: int = 1) -> pd.DataFrame:
+    """Read the data of all cities.
+
+    With `jobs` > 1 (or 0 for all cores), the readers run in a pool of worker processes. The
+    results are concatenated in the same order as in the serial case.
+    """
+    if jobs == 1:
+        dfs = [read() for read in tqdm(df_readers, mininterval=1)]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs or os.cpu_count()) as executor:
+            results = executor.map(call, df_readers)
+            dfs = list(tqdm(results, total=len(df_readers), mininterval=1))
     df = pd.concat(dfs, ignore_index=True)
+    # bool, rather than the object column that concatenating a dict with empty frames gave
+    df["is_regional_capital"] = df["is_regional_capital"].astype(bool)
     return df
 
 
-@cache
+# dates that contain this (lowercased) are cancelled events or totals, and are dropped
+cancelled_dates = r"abges|absag|gesamt"
+# applied in this order to the date texts
+date_rewrites = [
+    # line breaks -> spaces
+    (r"\n", " "),
+    # 01.01.2020 ... 31.12.2020 -> 01.01.2020
+    (r"^[^\d]*(\d\d)\.(\d\d)\.(\d{2,4}).*$", r"\1.\2.\3"),
+    # 01.01. ... 31.12.20 -> 01.01.20
+    (r"^[^\d]*(\d?\d)\.(\d?\d)\.[^\d].*\d?\d\.\d?\d\.(\d{2,4}).*$", r"\1.\2.\3"),
+    # 01. ... 31.02.20 -> 01.02.20
+    (r"^[^\d]*(\d?\d)\.[^\d].*\d?\d\.(\d?\d)\.(\d{2,4}).*$", r"\1.\2.\3"),
+]
+# exact formats that give the same dates as dateparser; dateparser reads two-digit years
+# month first (e.g. "05.01.15" as May 1), so "%d.%m.%y" is not among them
+date_formats = ["%d.%m.%Y", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d"]
+
+
+def parse_date_strings(dates: pd.Series) -> pd.Series:
+    """Parse date strings, first with exact formats on the whole column, then with dateparser.
+
+    Only the strings that match none of the `date_formats` are passed to dateparser.
+    """
+    parsed = pd.Series(pd.NaT, index=dates.index, dtype="datetime64[ns]")
+    for date_format in date_formats:
+        todo = parsed.isna()
+        parsed[todo] = pd.to_datetime(dates[todo], format=date_format, errors="coerce")
+        print(f"Parsed {todo.sum() - parsed.isna().sum()} dates with {date_format}")
+    todo = parsed.isna()
+    parsed[todo] = parse_residual_dates(dates[todo])
+    return parsed
+
+
+def rewrite_dates(texts: pd.Series) -> pd.Series:
+    """Reduce date ranges and lists to their first date."""
+    for pattern, replacement in date_rewrites:
+        texts = texts.str.replace(pattern, replacement, regex=True)
+    return texts
+
+
+def date_rules_version() -> str:
+    """Hash of everything that determines how a date text is parsed."""
+    rules = [date_rewrites, date_formats, dateparser_formats, dateparser_settings, languages]
+    rules = repr(rules) + dateparser.__version__ + pd.__version__
+    return hashlib.sha256(rules.encode()).hexdigest()[:16]
+
+
+def parse_date_texts(texts: pd.Series) -> pd.Series:
+    """Parse date texts, each distinct text only once.
+
+    The results are kept in a persistent dictionary in `.cache/dates`, keyed by the text and
+    the `date_rules_version`, so only texts that have not been seen before are parsed.
+    """
+    codes, uniques = pd.factorize(texts)
+    version = date_rules_version()
+    with Cache(".cache/dates") as date_cache:
+        known = {text: date_cache.get((version, text), default=False) for text in uniques}
+        new = pd.Series([text for text, date in known.items() if date is False], dtype=str)
+        print(f"{len(uniques) - len(new)} of {len(uniques)} distinct date texts already parsed")
+        parsed = parse_date_strings(rewrite_dates(new))
+        with date_cache.transact():
+            for text, date in zip(new, parsed):
+                known[text] = date_cache[(version, text)] = None if pd.isna(date) else date
+    dates = pd.to_datetime(pd.Series([known[text] for text in uniques], dtype=object))
+    return pd.Series(dates.to_numpy()[codes], index=texts.index)
+
+
+def parse_city_dates(texts: pd.Series, cities: pd.Series) -> pd.Series:
+    """Parse date texts with the expected formats of their city, and the rest generically.
+
+    The city formats are given by `readers.registry.date_format_hints`; texts that match none
+    of them go through `parse_date_texts`.
+    """
+    parsed = pd.Series(pd.NaT, index=texts.index, dtype="datetime64[ns]")
+    for city, formats in date_format_hints.items():
+        in_city = cities == city
+        for date_format in formats:
+            todo = in_city & parsed.isna()
+            parsed[todo] = pd.to_datetime(texts[todo], format=date_format, errors="coerce")
+    todo = parsed.isna()
+    print(f"Parsed {(~todo).sum()} of {len(texts)} dates with the formats of their city")
+    parsed[todo] = parse_date_texts(texts[todo])
+    return parsed
+
+
 def parse_dates(df):
     """Automatically parse dates from the event_date column.
 
@@ -70,29 +188,8 @@ def parse_dates(df):
     df["event_date"] = df["event_date"].astype(str)
     df["event_date_text"] = df["event_date"].copy()
     df = df[~df["event_date"].isna() & (df["event_date"].str.len() > 0)]
-    df = df[~df["event_date"].str.lower().str.contains(r"abges|absag|gesamt", regex=True)]
-    df["event_date"] = df["event_date"].str.replace("\n", " ")
-    # 01.01.2020 ... 31.12.2020 -> 01.01.2020
-    df["event_date"] = df["event_date"].str.replace(
-        r"^[^\d]*(\d\d)\.(\d\d)\.(\d{2,4}).*$", r"\1.\2.\3", regex=True
-    )
-    # 01.01. ... 31.12.20 -> 01.01.20
-    df["event_date"] = df["event_date"].str.replace(
-        r"^[^\d]*(\d?\d)\.(\d?\d)\.[^\d].*\d?\d\.\d?\d\.(\d{2,4}).*$", r"\1.\2.\3", regex=True
-    )
-    # 01. ... 31.02.20 -> 01.02.20
-    df["event_date"] = df["event_date"].str.replace(
-        r"^[^\d]*(\d?\d)\.[^\d].*\d?\d\.(\d?\d)\.(\d{2,4}).*$", r"\1.\2.\3", regex=True
-    )
-    df["event_date"] = (
-        df["event_date"]
-        .astype(str)
-        .swifter.apply(
-            parse,
-            date_formats=["%d.%m.%Y", "%Y-%m-%d %H:%M:%S"],
-            settings={"STRICT_PARSING": True},
-        )
-    )
+    df = df[~df["event_date"].str.lower().str.contains(cancelled_dates, regex=True)]
+    df["event_date"] = parse_city_dates(df["event_date"], df["city"])
     print(f"Could not parse {df['event_date'].isnull().sum()} of {len(df)} dates")
     return df
 
@@ -105,85 +202,125 @@ def add_unparsable_dates(df):
         with open(file, "w") as f:
             json.dump(dict(zip(keys, [""] * len(keys))), f, indent=4, ensure_ascii=False)
     else:
-        # assume that a human has entered the correct dates as values into the json file and read them back in
-        with open(file) as f:
-            unparseable_dates = json.load(f)
-        unparseable_dates = pd.Series(unparseable_dates).astype(str).apply(parse).values
-        df.loc[df["event_date"].isnull(), "event_date"].update(unparseable_dates)
+        # assume that a human has entered the correct dates as values into the json file
+        unparsable = df["event_date"].isnull()
+        df.loc[unparsable, "event_date"] = df.loc[unparsable, "event_date_text"].map(
+            date_corrections(file)
+        )
         df = df[~df["event_date"].isnull()]
     return df
 
 
+# the dates that each city covers, and whether it is part of the filtered datasets
+coverage_file = data / "interim/coverage.csv"
+# the default range of the dates of a city, for blank cells of the coverage table and cities
+# missing from it; other dates are weird
+date_range = (pd.Timestamp("2010-01-01"), pd.Timestamp("2024-01-01"))
+
+
+def read_coverage(file=coverage_file) -> pd.DataFrame:
+    """Read the coverage table, with one row per city.
+
+    `start` (inclusive) and `end` (exclusive) delimit the dates with event details, and are
+    taken from `date_range` where blank. `participants` (whether the city records participant
+    numbers) and `in_2018_2023` (whether its data is consistent throughout 2018-2023) are
+    computed from the data by `coverage_index.subset_flags`, and are only given where the
+    computed value is overridden.
+    """
+    coverage = pd.read_csv(file, index_col="city")
+    for column, default in zip(["start", "end"], date_range):
+        coverage[column] = pd.to_datetime(coverage[column]).fillna(default)
+    return coverage
+
+
+def _by_city(cities: pd.Series, values: pd.Series) -> pd.Series:
+    # look up a column of the coverage table for every row, in one pass
+    return pd.Series(values.reindex(cities).to_numpy(), index=cities.index)
+
+
 def process_dates(df):
     df = df.dropna(subset=["event_date"])
     df = parse_dates(df)
     df = add_unparsable_dates(df)
     df = df.drop(columns=["event_date_text"])
-    # event details are missing before these dates
-    df = df[
-        ~((df["city"] == "Kiel") & (df["event_date"] < pd.to_datetime("2021-04-01")))
-        & ~((df["city"] == "Saarbrücken") & (df["event_date"] < pd.to_datetime("2021-06-01")))
-        & ~((df["city"] == "Freiburg") & (df["event_date"] < pd.to_datetime("2013-01-01")))
-        & ~((df["city"] == "Bremen") & (df["event_date"] < pd.to_datetime("2019-01-01")))
-        & ~((df["city"] == "Dresden") & (df["event_date"] < pd.to_datetime("2020-07-01")))
-        & ~((df["city"] == "Köln") & (df["event_date"] < pd.to_datetime("2018-01-01")))
-        & ~((df["city"] == "Magdeburg") & (df["event_date"] < pd.to_datetime("2015-01-01")))
-        & ~((df["city"] == "Erfurt") & (df["event_date"] < pd.to_datetime("2012-01-01")))
-    ]
-    # remove weird dates
-    df = df[
-        (df["event_date"] < pd.to_datetime("2024-01-01"))
-        & (df["event_date"] >= pd.to_datetime("2010-01-01"))
-    ]
+    coverage = read_coverage()
+    start = _by_city(df["city"], coverage["start"]).fillna(date_range[0])
+    end = _by_city(df["city"], coverage["end"]).fillna(date_range[1])
+    df = df[(df["event_date"] >= start) & (df["event_date"] < end)]
     return df
 
 
-@cache
-def parse_participant_numbers(df, column):
-    df[column] = (
-        df[column]
-        .astype(str)
-        .str.lower()
-        .str.replace(r"\.0$", "", regex=True)
-        .str.replace(r"\.", "", regex=True)
-        .str.replace(r"^(ca|max|mind|bis zu|bis|unter|<|)|\+|plus|-$", "", regex=True)
-        .str.strip()
-        .str.replace(r"^(.*\D)?(\d+)\s*(personen|tn|menschen|teilnehm.*).*$", r"\2", regex=True)
-        .str.replace(
-            r"^(.*\D)?(\d+)\s*(fahrzeugen?|kfz|autos?|traktor(en)?|fahrrädern?).*$",
-            r"\2",
-            regex=True,
-        )
-        .str.replace(r"\n?neu:\s*(\d+)$", r"\1", regex=True)
-        .astype(int, errors="ignore")
-    )
-    df[f"{column}_type"] = (
-        df[column]
-        .replace(r"^\d+\s*(-|–|/|bis)\s*\d+$", "SPAN", regex=True)
-        .str.replace(r"^\d+$", "NUMBER", regex=True)
-        .replace(
-            r"^(nan|-+|\?+||/|wechselnd|offen|unbekannt|ka|nb|noch offen|keine\sangaben?|nicht angegeben|nicht bekannt|ohne)$",
-            "UNK",
-            regex=True,
-        )
-        .replace(r"^(?!SPAN|NUMBER|UNK)(.|\n)*$", r"UNPARSABLE", regex=True)
-    )
-    df.loc[df[f"{column}_type"] == "UNK", column] = None
-    return df
+def _sub(pattern: str, replacement: str):
+    return partial(re.compile(pattern).sub, replacement)
 
 
-@cache
-def parse_participant_number_spans(df, column):
+# applied in this order to the text of a participant number
+participant_rules = [
+    ("lowercase", str.lower),
+    ("decimal zero", _sub(r"\.0$", "")),
+    ("dots", _sub(r"\.", "")),
+    ("qualifiers", _sub(r"^(ca|max|mind|bis zu|bis|unter|<|)|\+|plus|-$", "")),
+    ("whitespace", str.strip),
+    ("persons", _sub(r"^(.*\D)?(\d+)\s*(personen|tn|menschen|teilnehm.*).*$", r"\2")),
+    (
+        "vehicles",
+        _sub(r"^(.*\D)?(\d+)\s*(fahrzeugen?|kfz|autos?|traktor(en)?|fahrrädern?).*$", r"\2"),
+    ),
+    ("new number", _sub(r"\n?neu:\s*(\d+)$", r"\1")),
+]
+# substituted in this order, so that the text is replaced by its type
+participant_types = [
+    ("SPAN", re.compile(r"^\d+\s*(-|–|/|bis)\s*\d+$")),
+    ("NUMBER", re.compile(r"^\d+$")),
+    (
+        "UNK",
+        re.compile(
+            r"^(nan|-+|\?+||/|wechselnd|offen|unbekannt|ka|nb|noch offen|keine\sangaben?|nicht angegeben|nicht bekannt|ohne)$"
+        ),
+    ),
+    ("UNPARSABLE", re.compile(r"^(?!SPAN|NUMBER|UNK)(.|\n)*$")),
+]
+
+
+def parse_span(s):
     # 150 - 200 -> 175
-    def parse_span(s):
-        parts = re.split(r"\s*(-|–|/|bis)\s*", s)
-        if len(parts) == 3:
-            return int((int(parts[0]) + int(parts[2])) / 2)
-        return s
-
-    df.loc[df[f"{column}_type"] == "SPAN", column] = (
-        df.loc[df[f"{column}_type"] == "SPAN", column].astype(str).map(parse_span)
-    )
+    parts = re.split(r"\s*(-|–|/|bis)\s*", s)
+    if len(parts) == 3:
+        return int((int(parts[0]) + int(parts[2])) / 2)
+    return s
+
+
+def parse_participant_number(text: str) -> tuple[str | int | None, str]:
+    """Normalise a participant number and classify it as NUMBER, SPAN, UNK or UNPARSABLE.
+
+    Returns the number (the mean for spans, None if unknown, the normalised text if
+    unparsable) and the type.
+    """
+    for _, rule in participant_rules:
+        text = rule(text)
+    kind = text
+    for name, pattern in participant_types:
+        kind = pattern.sub(name, kind)
+    if kind == "SPAN":
+        return parse_span(text), kind
+    if kind == "UNK":
+        return None, kind
+    return text, kind
+
+
+def parse_participant_numbers(df, columns):
+    """Parse the participant number columns, each distinct text only once.
+
+    Adds a `<column>_type` column with the type of each number.
+    """
+    texts = pd.concat([df[column].astype(str) for column in columns])
+    codes, uniques = pd.factorize(texts)
+    values, kinds = zip(*map(parse_participant_number, uniques)) if len(uniques) else ((), ())
+    values, kinds = np.array(values, dtype=object), np.array(kinds, dtype=object)
+    for i, column in enumerate(columns):
+        column_codes = codes[i * len(df) : (i + 1) * len(df)]
+        df[column] = values[column_codes]
+        df[f"{column}_type"] = kinds[column_codes]
     return df
 
 
@@ -202,40 +339,160 @@ def add_unparsable_participant_numbers(df, column):
                 ensure_ascii=False,
             )
     else:
-        # assume that a human has entered the correct numbers as values into the json file and read them back in
-        with open(file) as f:
-            unparseable_participant_numbers = json.load(f)
-        df.loc[df[f"{column}_type"] == "UNPARSABLE", column] = df.loc[
-            df[f"{column}_type"] == "UNPARSABLE", column
-        ].update(unparseable_participant_numbers)
+        # assume that a human has entered the correct numbers as values into the json file
+        unparsable = df[f"{column}_type"] == "UNPARSABLE"
+        corrected = df.loc[unparsable, column].map(participant_corrections(file))
+        df.loc[unparsable, column] = corrected.astype(float)
     return df
 
 
+participant_columns = ["participants_registered", "participants_actual"]
+
+
 def process_participant_numbers(df):
-    df = parse_participant_numbers(df, column="participants_registered")
-    df = add_unparsable_participant_numbers(df, column="participants_registered")
-    df = parse_participant_number_spans(df, column="participants_registered")
-    df["participants_registered"] = df["participants_registered"].astype(float)
-    df = parse_participant_numbers(df, column="participants_actual")
-    df = add_unparsable_participant_numbers(df, column="participants_actual")
-    df = parse_participant_number_spans(df, column="participants_actual")
-    df["participants_actual"] = df["participants_actual"].astype(float)
+    df = parse_participant_numbers(df, participant_columns)
+    for column in participant_columns:
+        df = add_unparsable_participant_numbers(df, column=column)
+        df[column] = df[column].astype(float)
     return df
 
 
-@cache
-def get_unified_dataset() -> pd.DataFrame:
-    df = read_dfs()
+compact_types = {
+    "city": "category",
+    "region": "category",
+    "is_regional_capital": bool,
+    "participants_registered": "Int32",
+    "participants_actual": "Int32",
+    "participants_registered_type": "category",
+    "participants_actual_type": "category",
+}
+
+
+def compact_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """Use compact types for the unified dataset, or for any of the datasets split from it.
+
+    City, region and the participant number types are categorical, the capital flag is
+    boolean, participant numbers are nullable 32-bit integers, and dates have second resolution.
+    This is for working with the data in memory; the exported datasets keep the default types.
+    """
+    types = {column: dtype for column, dtype in compact_types.items() if column in df.columns}
+    df = df.astype(types)
+    if pd.api.types.is_datetime64_dtype(df.get("date")):
+        df["date"] = df["date"].astype("datetime64[s]")
+    return df
+
+
+def memory_report(df: pd.DataFrame) -> pd.DataFrame:
+    """Memory usage per column in MB, with the current and with the compact schema."""
+    report = pd.DataFrame(
+        {
+            "current": df.memory_usage(deep=True),
+            "compact": compact_schema(df).memory_usage(deep=True),
+        }
+    )
+    report.loc["total"] = report.sum()
+    return (report / 2**20).round(2)
+
+
+def process(df: pd.DataFrame) -> pd.DataFrame:
+    """Parse the dates and participant numbers of the data read from the cities, and sort it."""
     df = process_dates(df)
     df = process_participant_numbers(df)
     df = df.rename(columns={"event_date": "date"})
-    df = df.sort_values(["region", "city", "date"])
+    return df.sort_values(["region", "city", "date"])
+
+
+def correction_files() -> list[Path]:
+    return [
+        coverage_file,
+        corrections.date_corrections_file,
+        corrections.participant_corrections_file,
+    ]
+
+
+def pipeline_inputs(**params) -> list[Path]:
+    """The data files and folders that the datasets are built from."""
+    return [data / folder for folder in reader_cache.folders] + correction_files()
+
+
+def pipeline_modules(**params) -> list:
+    """The modules whose code builds the datasets."""
+    modules = [sys.modules[__name__], corrections, interim, reader_cache, registry, residual_dates]
+    return modules + [inspect.getmodule(read) for read in df_readers]
+
+
+def city_inputs(city: str) -> list[Path]:
+    """The data files and folders that the partition of a city is built from."""
+    return [data / folder / city for folder in reader_cache.folders] + correction_files()
+
+
+def city_modules(city: str) -> list:
+    """The modules whose code builds the partition of a city."""
+    modules = [sys.modules[__name__], corrections, interim, reader_cache, registry, residual_dates]
+    return modules + [inspect.getmodule(read) for read in df_readers if read.city == city]
+
+
+@stage(city_inputs, city_modules, version=date_rules_version)
+def unified_city(city: str) -> pd.DataFrame:
+    """Read and process the data of one city.
+
+    The rows keep their position in the data read from the city, and the number of rows read is
+    kept in `attrs["rows_read"]`, so that `merge_partitions` can number the rows like
+    `read_dfs`.
+    """
+    (read,) = [read for read in df_readers if read.city == city]
+    df = read().reset_index(drop=True)
+    rows_read = len(df)
+    if rows_read:
+        # in the unified data, cities without participant numbers have them missing
+        missing = [column for column in participant_columns if column not in df.columns]
+        df = process(df.assign(**{column: np.nan for column in missing}))
+        df = df.drop(columns=missing)
+    df.attrs["rows_read"] = rows_read
     return df
 
 
-@cache
-def get_all_datasets():
-    df = get_unified_dataset()
+def merge_partitions(partitions: list[pd.DataFrame]) -> pd.DataFrame:
+    """Merge the partitions of the cities, given in the order of `df_readers`, like `process`
+    would have processed them together."""
+    offsets = np.cumsum([0] + [df.attrs["rows_read"] for df in partitions])
+    columns = list(dict.fromkeys(column for df in partitions for column in df.columns))
+    types = [f"{column}_type" for column in participant_columns]
+    columns = [column for column in columns if column not in types] + types
+    partitions = [
+        df.set_axis(df.index + offset) for df, offset in zip(partitions, offsets) if len(df)
+    ]
+    partitions.sort(key=lambda df: (df["region"].iloc[0], df["city"].iloc[0]))
+    return pd.concat(partitions)[columns]
+
+
+@stage(
+    pipeline_inputs, pipeline_modules, version=date_rules_version, ignore=("jobs", "incremental")
+)
+def unified_dataset(jobs: int = 1, incremental: bool = False) -> pd.DataFrame:
+    """Read and process the data of all cities (see `get_unified_dataset`)."""
+    if incremental:
+        return merge_partitions([unified_city(read.city) for read in df_readers])
+    return process(read_dfs(jobs=jobs))
+
+
+def get_unified_dataset(
+    jobs: int = 1, compact: bool = False, incremental: bool = False
+) -> pd.DataFrame:
+    """Read and process the data of all cities.
+
+    With `incremental`, each city is processed on its own and cached as a partition, so that
+    only the cities whose files (or the coverage table or correction files) changed are
+    processed again. The result is the same. With `compact`, the cached result is returned with
+    the types of `compact_schema`.
+    """
+    df = unified_dataset(jobs=jobs, incremental=incremental)
+    return compact_schema(df) if compact else df
+
+
+def split_datasets(df: pd.DataFrame):
+    """The datasets of 2023, of 2018-2023 and of all data from the unified dataset, with the
+    dates formatted as text. The cities of the subsets are given by `subset_flags`."""
     df = df[
         [
             "region",
@@ -247,52 +504,44 @@ def get_all_datasets():
             "participants_actual",
         ]
     ]
+    from german_protest_registrations.coverage_index import build_coverage_index, subset_flags
 
-    df_unfiltered = df.copy()
-    df_unfiltered["date"] = df_unfiltered["date"].dt.strftime("%Y-%m-%d")
-    df_unfiltered.to_csv(
-        data / "processed/german_protest_registrations_17_cities_unfiltered.csv",
-        index=False,
-    )
+    flags = subset_flags(build_coverage_index(df), read_coverage())
+    participants = _by_city(df["city"], flags["participants"]).eq(True)
+    in_2018_2023 = _by_city(df["city"], flags["in_2018_2023"]).eq(True)
+    in_2023 = (df["date"].dt.year == 2023) & participants
+    in_2018 = (df["date"].dt.year >= 2018) & participants & in_2018_2023
+    df = df.assign(date=df["date"].dt.strftime("%Y-%m-%d"))
+    return df[in_2023], df[in_2018], df
 
-    df_2023 = df[df["date"].dt.year == 2023]
-    df_2023 = df_2023[
-        ~df_2023["city"].isin(
-            [
-                "Bremen",
-                "Freiburg",
-                "Erfurt",
-            ]  # these do not have the number of participants
-        )
-    ]
-    df_2023["date"] = df_2023["date"].dt.strftime("%Y-%m-%d")
-    df_2023.to_csv(data / "processed/german_protest_registrations_12_cities_2023.csv", index=False)
-    df_2018 = df[df["date"].dt.year >= 2018]
-    df_2018 = df_2018[
-        ~df_2018["city"].isin(
-            [
-                "Bremen",
-                "Freiburg",
-                "Erfurt",
-                "Berlin",  # ends in 2022
-                "Dortmund",  # starts in 2019, inconsistent 2018
-                "Karlsruhe",
-                "Köln",  # missing years
-                "Wuppertal",
-                "Saarbrücken",
-                "Dresden",
-                "Kiel",
-                "Potsdam",  # not 2018
-                "Wiesbaden",  # not 2018
-            ]  # these do not have the number of participants or are not available throughout 2018-2023
-        )
-    ]
-    df_2018["date"] = df_2018["date"].dt.strftime("%Y-%m-%d")
-    df_2018.to_csv(
-        data / "processed/german_protest_registrations_4_cities_2018-2023.csv",
-        index=False,
-    )
-    return df_2023, df_2018, df_unfiltered
+
+def split_modules(**params) -> list:
+    """The modules whose code builds the datasets and their subsets."""
+    from german_protest_registrations import coverage_index
+
+    return pipeline_modules() + [coverage_index]
+
+
+@stage(pipeline_inputs, split_modules, version=date_rules_version)
+def filtered_datasets():
+    """The datasets of 2023, of 2018-2023 and of all data, with the dates formatted as text."""
+    return split_datasets(get_unified_dataset())
+
+
+def get_all_datasets(compact: bool = False, formats=("csv", "dataset"), jobs: int = 0):
+    """Write the datasets of 2023, of 2018-2023 and of all data to `data/processed`, and the
+    unified dataset to the snapshot (see `snapshot`).
+
+    See `export.export_datasets` for the `formats` and `jobs`. The written files are the same
+    with `compact`, which only gives the returned datasets the types of `compact_schema`.
+    """
+    fingerprint = current_fingerprint()
+    write_snapshot(get_unified_dataset(), fingerprint=fingerprint)
+    datasets = filtered_datasets()
+    export_datasets(dict(zip(variants.values(), datasets)), formats=formats, jobs=jobs)
+    if compact:
+        return tuple(compact_schema(df) for df in datasets)
+    return datasets
 
 
 if __name__ == "__main__":
@@ -303,3 +552,4 @@ if __name__ == "__main__":
     print(df_2022.shape)
     print(df_2019["city"].nunique())
     print(df_2019.shape)
+    print(memory_report(get_unified_dataset()))
@@ -0,0 +1,26 @@
+"""Tests for the compiled manual corrections."""
+
+import json
+
+import pandas as pd
+
+from german_protest_registrations import stage_cache
+from german_protest_registrations.corrections import date_corrections, participant_corrections
+
+
+def test_corrections_are_typed_and_recompiled_when_the_file_changes(tmp_path, monkeypatch):
+    monkeypatch.setattr(stage_cache, "cache_dir", tmp_path / "stages")
+    file = tmp_path / "unparsable_dates.json"
+    file.write_text(json.dumps({"07.06., 14.06.": "07.06.2018", "montags": None}))
+    dates = date_corrections(file)
+    assert dates.to_dict() == {"07.06., 14.06.": pd.Timestamp("2018-06-07")}
+    file.write_text(json.dumps({"montags": "02.01.2019"}))
+    assert date_corrections(file).to_dict() == {"montags": pd.Timestamp("2019-01-02")}
+
+    file = tmp_path / "unparsable_participant_numbers.json"
+    file.write_text(json.dumps({"300-500\n150-200": "175", "jew 100": None}))
+    numbers = participant_corrections(file)
+    assert numbers.dtype == "Int64"
+    assert numbers.to_dict() == {"300-500\n150-200": 175}
+    file.write_text(json.dumps({"jew 100": None}))
+    assert participant_corrections(file).empty
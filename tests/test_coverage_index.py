@@ -0,0 +1,64 @@
+"""Tests for the coverage index and the subset builder."""
+
+import numpy as np
+import pandas as pd
+
+from german_protest_registrations.coverage_index import (
+    build_coverage_index,
+    build_subset,
+    subset_flags,
+)
+
+
+def test_subset_of_covered_cities():
+    dates = pd.to_datetime(["2022-01-05", "2022-02-10", "2022-03-01", "2022-01-20", "2022-03-31"])
+    df = pd.DataFrame(
+        {
+            "city": ["Kiel", "Kiel", "Kiel", "Mainz", "Mainz"],
+            "date": dates,
+            "participants_registered": [10.0, np.nan, 30.0, 5.0, np.nan],
+            "participants_actual": [np.nan, 20.0, np.nan, np.nan, np.nan],
+        }
+    )
+    index = build_coverage_index(df)
+    assert len(index) == 6
+    assert index.loc["Mainz", "events"].tolist() == [1, 0, 1]
+    assert index.loc["Kiel", "participants_registered"].tolist() == [1.0, 0.0, 1.0]
+    assert index.loc["Kiel", "participants"].tolist() == [1.0, 1.0, 1.0]
+
+    cities, rows = build_subset(df, index, "2022-01", "2022-03")
+    assert cities == ["Kiel"]
+    assert len(rows) == 3
+    cities, rows = build_subset(df, index, "2022-01", "2022-03", min_months=0.5)
+    assert cities == ["Kiel", "Mainz"]
+    cities, _ = build_subset(df, index, "2022-01", "2022-03", columns=["participants_registered"])
+    assert cities == []
+    cities, rows = build_subset(df, index, "2022-02", "2022-03", columns=["participants"])
+    assert cities == ["Kiel"]
+    assert rows["date"].tolist() == dates[1:3].tolist()
+
+
+def test_subset_flags_with_overrides():
+    months = pd.date_range("2018-01-01", "2023-12-01", freq="MS")
+    df = pd.DataFrame(
+        {
+            "city": ["Kiel"] * len(months) + ["Mainz"] * 12,
+            "date": months.append(months[-12:]),
+            "participants_registered": [1.0] * len(months) + [np.nan] * 11 + [5.0],
+            "participants_actual": np.nan,
+        }
+    )
+    overrides = pd.DataFrame(
+        {"participants": [np.nan, True], "in_2018_2023": [False, np.nan]},
+        index=pd.Index(["Kiel", "Augsburg"], name="city"),
+    )
+    index = build_coverage_index(df)
+    flags = subset_flags(index, overrides.iloc[:0])
+    assert flags.to_dict("index") == {
+        "Kiel": {"participants": True, "in_2018_2023": True},
+        "Mainz": {"participants": False, "in_2018_2023": False},
+    }
+    flags = subset_flags(index, overrides)
+    assert flags.loc["Kiel"].tolist() == [True, False]
+    assert flags.loc["Augsburg"].tolist() == [True, False]
+    assert subset_flags(index, overrides, min_participants=0.05).loc["Mainz", "participants"]
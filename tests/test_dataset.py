@@ -0,0 +1,29 @@
+"""Tests for the partitioned Parquet datasets."""
+
+import pandas as pd
+
+from german_protest_registrations import dataset
+from german_protest_registrations.dataset import load_dataset, write_dataset
+
+
+def test_load_reads_requested_partitions_in_order(tmp_path, monkeypatch):
+    monkeypatch.setattr(dataset, "data", tmp_path)
+    df = pd.DataFrame(
+        {
+            "region": ["Bayern", "Bayern", "Nordrhein-Westfalen", "Nordrhein-Westfalen"],
+            "city": ["München", "München", "Kiel", "Köln"],
+            "date": ["2022-12-31", "2023-01-01", "2023-02-01", "2023-01-05"],
+            "topic": ["Frieden", 2023, None, "Klima"],
+            "participants_registered": [10.0, None, 30.0, 40.0],
+        }
+    )
+    write_dataset(df, tmp_path / "processed" / dataset.variants["unfiltered"])
+    loaded = load_dataset()
+    assert loaded.columns.tolist() == df.columns.tolist()
+    assert loaded["topic"].tolist() == ["Frieden", "2023", pd.NA, "Klima"]
+    pd.testing.assert_frame_equal(
+        loaded.drop(columns="topic"), df.drop(columns="topic"), check_dtype=False
+    )
+
+    loaded = load_dataset(columns=["date"], cities=["München", "Köln"], years=[2023])
+    assert loaded["date"].tolist() == ["2023-01-01", "2023-01-05"]
@@ -0,0 +1,31 @@
+"""Tests for the export of the datasets."""
+
+import pandas as pd
+import pytest
+
+from german_protest_registrations import export
+from german_protest_registrations.export import export_datasets
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_export_formats(tmp_path, monkeypatch, jobs):
+    monkeypatch.setattr(export, "data", tmp_path)
+    (tmp_path / "processed").mkdir()
+    df = pd.DataFrame({"date": ["2023-01-02", "2023-01-03"], "topic": ["Frieden", 2023]})
+    paths = export_datasets(
+        {"a": df, "b": df.head(1)}, formats=["csv", "csv.gz", "parquet"], jobs=jobs
+    )
+    assert [path.name for path in paths] == [
+        "a.csv",
+        "a.csv.gz",
+        "a.parquet",
+        "b.csv",
+        "b.csv.gz",
+        "b.parquet",
+    ]
+    expected = pd.DataFrame({"date": ["2023-01-02", "2023-01-03"], "topic": ["Frieden", "2023"]})
+    pd.testing.assert_frame_equal(pd.read_csv(tmp_path / "processed/a.csv.gz", dtype=str), expected)
+    parquet = pd.read_parquet(tmp_path / "processed/a.parquet")
+    pd.testing.assert_frame_equal(parquet.astype(object), expected)
+    with pytest.raises(ValueError):
+        export_datasets({"a": df}, formats=["xlsx"])
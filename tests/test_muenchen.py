@@ -0,0 +1,27 @@
+"""Tests for the single-pass München sheet reader."""
+
+import pandas as pd
+from openpyxl import Workbook, load_workbook
+from openpyxl.styles import Font
+
+from german_protest_registrations.readers.muenchen import read_sheet
+
+
+def test_read_sheet_matches_read_excel(tmp_path):
+    wb = Workbook()
+    sheet = wb.active
+    sheet.append(["Liste"])
+    sheet.append([])
+    sheet.append(["Datum", "Thema", None, "Thema"])
+    sheet.append(["01.01.2022", "Klima", None, 12])
+    sheet.append(["02.01.2022", None, None, 7.5])
+    sheet.append(["03.01.2022", "Miete", None, 3])
+    sheet["A5"].font = Font(color="FFFF0000")
+    path = tmp_path / "2022.xlsx"
+    wb.save(path)
+
+    wb = load_workbook(path, read_only=True, data_only=True)
+    df = read_sheet(wb.worksheets[0], skiprows=2, default_font=Font())
+    expected = pd.read_excel(path, skiprows=2)
+    pd.testing.assert_frame_equal(df.drop(columns="cancelled"), expected)
+    assert df["cancelled"].tolist() == [False, True, False]
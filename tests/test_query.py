@@ -0,0 +1,50 @@
+"""Tests for the indexed lookups of events by city and date."""
+
+import numpy as np
+import pandas as pd
+
+from german_protest_registrations.query import EventIndex
+
+
+def test_lookups_match_a_scan():
+    df = pd.DataFrame(
+        {
+            "city": ["Mainz", "Kiel", "Kiel", "Mainz", "Kiel", "Kiel"],
+            "date": pd.to_datetime(
+                ["2022-01-20", "2022-02-10", "2022-01-05", "2022-03-31", "2022-03-01", "2022-01-05"]
+            ),
+            "topic": ["Klima", "Corona-Maßnahmen", "Frieden", None, "CORONA", 2022],
+            "participants_registered": [5.0, 20.0, 10.0, np.nan, 30.0, 1.0],
+        }
+    )
+    index = EventIndex(df)
+    assert index.cities == ["Kiel", "Mainz"]
+
+    events = index.events("Kiel", "2022-01-05", "2022-02-10")
+    assert events["topic"].tolist() == ["Frieden", 2022, "Corona-Maßnahmen"]
+    assert index.count("Kiel", "2022-01-06") == 2
+    assert index.count("Kiel", end="2022-01-04") == 0
+    assert index.count("Berlin") == 0
+    assert index.count(["Kiel", "Mainz"], "2022-01-10", "2022-03-31") == 4
+    assert index.count(["Kiel", "Mainz"], topic="corona") == 2
+
+    months = index.aggregate(["Kiel", "Mainz"], freq="MS")
+    assert months["events"].tolist() == [3, 1, 2]
+    assert months["participants_registered"].tolist() == [16.0, 20.0, 30.0]
+
+
+def test_categorical_cities_out_of_alphabetical_order():
+    df = pd.DataFrame(
+        {
+            "city": pd.Categorical(
+                ["Kiel", "Mainz", "Augsburg", "Kiel"], categories=["Mainz", "Kiel", "Augsburg"]
+            ),
+            "date": pd.to_datetime(["2022-01-02", "2022-01-01", "2022-01-03", "2022-01-01"]),
+            "topic": ["a", "b", "c", "d"],
+        }
+    )
+    index = EventIndex(df)
+    assert index.cities == ["Mainz", "Kiel", "Augsburg"]
+    for city in ["Augsburg", "Kiel", "Mainz"]:
+        assert set(index.events(city)["city"]) == {city}
+    assert index.events("Kiel")["topic"].tolist() == ["d", "a"]
@@ -0,0 +1,35 @@
+"""Tests for the per-reader result cache."""
+
+import pandas as pd
+
+from german_protest_registrations import reader_cache, stage_cache
+from german_protest_registrations.reader_cache import cached_reader
+
+calls = []
+
+
+@cached_reader("Teststadt")
+def read_teststadt():
+    calls.append(read_teststadt)
+    return pd.read_csv(reader_cache.data / "interim/csv/Teststadt/2023.csv")
+
+
+def test_reader_runs_again_only_when_its_files_change(tmp_path, monkeypatch):
+    monkeypatch.setattr(reader_cache, "data", tmp_path)
+    monkeypatch.setattr(stage_cache, "cache_dir", tmp_path / "stages")
+    folder = tmp_path / "interim/csv/Teststadt"
+    folder.mkdir(parents=True)
+    (folder / "2023.csv").write_text("Datum,Thema\n01.01.2023,Klima\n")
+    (tmp_path / "interim/csv/Andere").mkdir()
+
+    assert read_teststadt()["Thema"].tolist() == ["Klima"]
+    assert read_teststadt()["Thema"].tolist() == ["Klima"]
+    assert len(calls) == 1
+
+    (tmp_path / "interim/csv/Andere/2023.csv").write_text("Datum\n02.01.2023\n")
+    read_teststadt()
+    assert len(calls) == 1
+
+    (folder / "2023.csv").write_text("Datum,Thema\n01.01.2023,Miete\n")
+    assert read_teststadt()["Thema"].tolist() == ["Miete"]
+    assert len(calls) == 2
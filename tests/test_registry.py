@@ -0,0 +1,44 @@
+"""Tests for the declarative city readers."""
+
+from german_protest_registrations.interim import read_interim
+from german_protest_registrations.readers import registry
+from german_protest_registrations.readers.registry import CitySpec, read_city, usecols
+
+
+def test_read_city(tmp_path, monkeypatch):
+    monkeypatch.setattr(registry, "data", tmp_path)
+    folder = tmp_path / "interim/csv/Teststadt"
+    folder.mkdir(parents=True)
+    (folder / "2022.csv").write_text("Liste,\nDatum,Thema\n01.01.2022,Klima\n,\n")
+    (folder / "2023.csv").write_text("Liste,\nTag,Motto\n02.01.2023,Miete\n")
+    (folder / "Vorlage.csv").write_text("Liste,\nA,B\n,\n")
+    spec = CitySpec(
+        city="Teststadt",
+        region="Testland",
+        is_regional_capital=False,
+        aliases={"Datum": "event_date", "Tag": "event_date", "Thema": "topic", "Motto": "topic"},
+        columns=["event_date", "topic", "location"],
+        skiprows=1,
+        require_date=True,
+        dropna=["event_date"],
+    )
+    df = read_city(spec).sort_values("event_date")
+    assert df.columns.tolist() == ["event_date", "topic", "city", "region", "is_regional_capital"]
+    assert df["event_date"].tolist() == ["01.01.2022", "02.01.2023"]
+    assert df["topic"].tolist() == ["Klima", "Miete"]
+    assert (df["city"] == "Teststadt").all()
+
+
+def test_only_needed_columns_are_read_as_strings(tmp_path):
+    file = tmp_path / "2022.csv"
+    file.write_text("Datum,Thema,Bemerkung,TN\n01.01.2022,Klima,x,007\n")
+    spec = CitySpec(
+        city="Teststadt",
+        region="Testland",
+        is_regional_capital=False,
+        aliases={"Datum": "event_date", "TN": "participants_registered"},
+        columns=["event_date", "participants_registered"],
+    )
+    df = read_interim(file, usecols=usecols(spec))
+    assert df.columns.tolist() == ["Datum", "TN"]
+    assert df["TN"].tolist() == ["007"]
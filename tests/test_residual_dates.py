@@ -0,0 +1,20 @@
+"""Tests for the residual date parsing with dateparser."""
+
+import pandas as pd
+from dateparser import parse
+
+from german_protest_registrations import residual_dates
+from german_protest_registrations.residual_dates import parse_residual_dates
+
+
+def test_residual_dates_match_dateparser(monkeypatch):
+    texts = pd.Series(["05.01.15", "3. Mai 2019", "12:08.2023", "montags", "05.01.15", "2/6/22"])
+    expected = texts.apply(
+        parse,
+        date_formats=residual_dates.dateparser_formats,
+        settings=residual_dates.dateparser_settings,
+    )
+    expected = pd.to_datetime(expected)
+    pd.testing.assert_series_equal(parse_residual_dates(texts, jobs=1), expected)
+    monkeypatch.setattr(residual_dates, "chunk_size", 2)
+    pd.testing.assert_series_equal(parse_residual_dates(texts, jobs=2), expected)
@@ -0,0 +1,37 @@
+"""Tests for the rule report."""
+
+import pandas as pd
+
+from german_protest_registrations.rule_report import apply_rules, date_report
+from german_protest_registrations.unify import parse_dates
+
+
+def test_apply_rules_counts_changed_rows_by_city():
+    texts = pd.Series(["A", "b", "A", "c"])
+    cities = pd.Series(["Kiel", "Kiel", "Mainz", "Mainz"])
+    rules = [("lowercase", str.lower), ("a to b", lambda text: text.replace("a", "b"))]
+    texts, records = apply_rules("test", texts, cities, rules)
+    assert texts.tolist() == ["b", "b", "b", "c"]
+    assert [(r["rule"], r["rows"], r["cities"]) for r in records] == [
+        ("lowercase", 2, {"Kiel": 1, "Mainz": 1}),
+        ("a to b", 2, {"Kiel": 1, "Mainz": 1}),
+    ]
+
+
+def test_date_report_accounts_for_every_row(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    df = pd.DataFrame(
+        {
+            "event_date": ["2020-01-01 00:00:00", "01.02.2020 - 03.02.2020", "abgesagt", "?"],
+            "city": ["Kiel", "Kiel", "Erfurt", "Erfurt"],
+        }
+    )
+    records = {r["rule"]: r["rows"] for r in date_report(df)}
+    assert records["Kiel: %Y-%m-%d %H:%M:%S"] == 1
+    assert records["cancelled or total"] == 1
+    assert records["%d.%m.%Y"] == 1
+    assert records["unparsed"] == 1
+    # the report uses the same filters and rules as the pipeline
+    parsed = parse_dates(df.copy())
+    assert len(parsed) == 3
+    assert parsed["event_date"].isna().sum() == records["unparsed"]
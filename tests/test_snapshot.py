@@ -0,0 +1,71 @@
+"""Tests for the Arrow snapshot of the unified dataset."""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from german_protest_registrations import snapshot, stage_cache, unify
+from german_protest_registrations.readers.kiel import kiel
+from german_protest_registrations.readers.magdeburg import magdeburg
+from german_protest_registrations.snapshot import (
+    load_snapshot,
+    snapshot_fingerprint,
+    write_snapshot,
+)
+
+
+def test_snapshot_round_trip(tmp_path, monkeypatch):
+    monkeypatch.setattr(snapshot, "current_fingerprint", lambda: "test")
+    df = pd.DataFrame(
+        {
+            "city": ["Kiel", "Mainz", "Kiel"],
+            "date": pd.to_datetime(["2022-01-01", "2023-05-01", "2021-03-04"]),
+            "topic": ["Frieden", 500, np.nan],
+            "participants_registered": [10.0, np.nan, 30.0],
+        },
+        index=[4, 0, 2],
+    )
+    file = tmp_path / "unified.arrow"
+    write_snapshot(df, file, fingerprint="test")
+    expected = df.assign(topic=["Frieden", "500", np.nan])
+    pd.testing.assert_frame_equal(load_snapshot(file=file), expected)
+    pd.testing.assert_frame_equal(load_snapshot(["city", "date"], file=file), df[["city", "date"]])
+    zero_copy = load_snapshot(file=file, zero_copy=True)
+    assert isinstance(zero_copy["city"].dtype, pd.ArrowDtype)
+    assert zero_copy["city"].tolist() == df["city"].tolist()
+
+
+def test_snapshot_is_rebuilt_when_an_input_changes(tmp_path, monkeypatch):
+    monkeypatch.setattr(unify, "df_readers", [kiel, magdeburg])
+    monkeypatch.setattr(stage_cache, "cache_dir", tmp_path / "stages")
+    coverage = tmp_path / "coverage.csv"
+    coverage.write_bytes(unify.coverage_file.read_bytes())
+    # the copy is only an input of the fingerprint; the coverage is still read from the original
+    monkeypatch.setattr(snapshot, "inputs", lambda: [coverage])
+    writes = []
+    monkeypatch.setattr(
+        snapshot,
+        "write_snapshot",
+        lambda df, file, fingerprint: (
+            writes.append(fingerprint) or write_snapshot(df, file, fingerprint)
+        ),
+    )
+    file = tmp_path / "unified.arrow"
+
+    df = load_snapshot(["city"], file=file)
+    assert set(df["city"]) == {"Kiel", "Magdeburg"}
+    load_snapshot(["city"], file=file)
+    assert len(writes) == 1
+
+    coverage.write_text(coverage.read_text() + "Teststadt,,,False,False,\n")
+    load_snapshot(["city"], file=file)
+    assert len(writes) == 2
+    assert writes[0] != writes[1] == snapshot_fingerprint(file)
+
+
+def test_fingerprint_covers_the_pipeline():
+    inputs = snapshot.inputs()
+    assert set(unify.pipeline_inputs()) <= set(inputs)
+    for module in unify.pipeline_modules():
+        assert any(Path(module.__file__).is_relative_to(path) for path in inputs)
@@ -0,0 +1,67 @@
+"""Tests for the stage cache."""
+
+import sys
+
+import numpy as np
+import pandas as pd
+
+from german_protest_registrations import stage_cache
+from german_protest_registrations.stage_cache import read_frame, stage, write_frame
+
+
+def test_frames_round_trip(tmp_path):
+    df = pd.DataFrame(
+        {
+            "date": pd.to_datetime(["2020-01-01", "2021-02-03", None]).astype("datetime64[s]"),
+            "text": ["a", np.nan, "c"],
+            "mixed": ["a", 1, None],
+            "city": pd.Categorical(["Kiel", "Kiel", "Mainz"]),
+            "n": pd.array([1, None, 3], dtype="Int32"),
+        },
+        index=[3, 3, 1],
+    )
+    write_frame(df, tmp_path / "frame")
+    pd.testing.assert_frame_equal(read_frame(tmp_path / "frame"), df)
+    assert read_frame(tmp_path / "frame")["mixed"].tolist() == ["a", 1, None]
+
+
+def test_stage_is_keyed_by_inputs_and_evicts(tmp_path, monkeypatch):
+    monkeypatch.setattr(stage_cache, "cache_dir", tmp_path / "stages")
+    monkeypatch.setattr(stage_cache, "stats", stage_cache.Counter())
+    file = tmp_path / "input.csv"
+    file.write_text("a\n1\n")
+    calls = []
+
+    @stage(lambda: [file], lambda: [sys.modules[__name__]], ignore=("jobs",))
+    def read(jobs=1):
+        calls.append(jobs)
+        return pd.read_csv(file), pd.read_csv(file) * 2
+
+    assert read()[1]["a"].tolist() == [2]
+    assert read(jobs=4)[1]["a"].tolist() == [2]
+    file.write_text("a\n5\n")
+    assert read()[0]["a"].tolist() == [5]
+    assert calls == [1, 1]
+    assert stage_cache.cache_report()["hits"] == 1
+    assert stage_cache.cache_report()["entries"] == 2
+
+    monkeypatch.setattr(stage_cache, "max_size", 0)
+    file.write_text("a\n6\n")
+    read()
+    assert stage_cache.cache_report()["entries"] == 1
+    assert stage_cache.cache_report()["evictions"] == 2
+
+
+def test_evict_leaves_unfinished_results(tmp_path, monkeypatch):
+    monkeypatch.setattr(stage_cache, "cache_dir", tmp_path)
+    monkeypatch.setattr(stage_cache, "max_size", 0)
+    unfinished = tmp_path / "read-0123456789abcdef.4242.tmp"
+    unfinished.mkdir()
+    (unfinished / "frame.parquet").write_bytes(b"0" * 100)
+    (tmp_path / "read-fedcba9876543210").mkdir()
+    (tmp_path / "read-fedcba9876543210" / "frame.parquet").write_bytes(b"0" * 100)
+
+    stage_cache.evict()
+    assert [entry.name for entry in tmp_path.iterdir()] == [unfinished.name]
+    assert stage_cache.cache_report()["entries"] == 0
+    assert stage_cache._size(tmp_path / "missing") == 0
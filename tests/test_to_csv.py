@@ -0,0 +1,116 @@
+"""Tests for the raw-to-interim conversion."""
+
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from german_protest_registrations import to_csv
+from german_protest_registrations.interim import parquet_path, read_interim
+
+
+@pytest.fixture
+def raw_tree(tmp_path, monkeypatch):
+    """A minimal data/raw tree in a temporary working directory."""
+    folder = tmp_path / "data" / "raw" / "Teststadt"
+    folder.mkdir(parents=True)
+    (folder / "2022.csv").write_text("Datum;Thema\n01.01.2022;Klima\n02.01.2022;Frieden\n")
+    (folder / "2023.tsv").write_text("Datum\tThema\n03.01.2023;Miete\n")
+    (folder / "2023.pdf").write_bytes(b"%PDF-1.4")
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def read_outputs(root: Path) -> dict[str, bytes]:
+    folder = root / "data" / "interim" / "csv"
+    return {str(p.relative_to(folder)): p.read_bytes() for p in folder.rglob("*.csv")}
+
+
+def test_parallel_output_matches_serial(raw_tree):
+    to_csv.main(jobs=1)
+    serial = read_outputs(raw_tree)
+    assert set(serial) == {"Teststadt/2022.csv", "Teststadt/2023.csv"}
+    for path in (raw_tree / "data" / "interim" / "csv").rglob("*.csv"):
+        path.unlink()
+    to_csv.main(jobs=2)
+    assert read_outputs(raw_tree) == serial
+
+
+def test_incremental_conversion(raw_tree, monkeypatch):
+    to_csv.main()
+    converted = []
+    convert_file = to_csv.convert_file
+    monkeypatch.setattr(
+        to_csv,
+        "convert_file",
+        lambda file, **kw: converted.append(file) or convert_file(file, **kw),
+    )
+    to_csv.main()
+    assert converted == []
+
+    (raw_tree / "data" / "raw" / "Teststadt" / "2023.tsv").unlink()
+    to_csv.main()
+    assert set(read_outputs(raw_tree)) == {"Teststadt/2022.csv"}
+    assert [file.name for file in converted] == ["2022.csv"]
+
+
+def test_parquet_matches_csv(raw_tree):
+    to_csv.main(parquet=True)
+    for file in (raw_tree / "data" / "interim" / "csv").rglob("*.csv"):
+        assert parquet_path(file).exists()
+        for skiprows in [0, 1]:
+            pd.testing.assert_frame_equal(
+                read_interim(file, skiprows=skiprows), pd.read_csv(file, skiprows=skiprows)
+            )
+
+
+def test_parquet_keeps_the_read_csv_types(raw_tree, monkeypatch):
+    (raw_tree / "data" / "raw" / "Teststadt" / "2024.csv").write_text(
+        "Datum,Abgesagt,Bestätigt,TN,Kennung,Notiz,Leer\n"
+        "01.01.2024,True,TRUE,10,99999999999999999999,NA,\n"
+        "02.01.2024,false,,,1, True,\n"
+        "03.01.2024,False,False,2.5,2,n/a,\n"
+    )
+    to_csv.main(parquet=True)
+    file = raw_tree / "data" / "interim" / "csv" / "Teststadt" / "2024.csv"
+    expected = pd.read_csv(file)
+    types = " ".join(expected.dtypes.astype(str))
+    assert types == "object bool object float64 object object float64"
+    monkeypatch.setattr(pd, "read_csv", lambda *args, **kwargs: pytest.fail("read the CSV"))
+    df = read_interim(file)
+    pd.testing.assert_frame_equal(df, expected)
+    assert df["Bestätigt"].tolist()[::2] == [True, False]
+
+
+def test_projected_read_uses_parquet(raw_tree, monkeypatch):
+    to_csv.main(parquet=True)
+    file = raw_tree / "data" / "interim" / "csv" / "Teststadt" / "2022.csv"
+    expected = pd.read_csv(file, usecols=["Thema"], dtype=str)
+    monkeypatch.setattr(pd, "read_csv", lambda *args, **kwargs: pytest.fail("read the CSV"))
+    pd.testing.assert_frame_equal(read_interim(file, usecols={"Thema", "TN"}), expected)
+
+    # a Parquet file that is older than the CSV file is not used
+    file.touch()
+    with pytest.raises(pytest.fail.Exception):
+        read_interim(file, usecols={"Thema"})
+
+
+def test_streamed_conversion_matches_table_shape(raw_tree):
+    from openpyxl import Workbook
+
+    wb = Workbook()
+    sheet = wb.active
+    sheet.title = "Tabelle1"
+    sheet.append(["Datum", "Thema", None, "Thema"])
+    sheet.append(["01.01.2022", "Klima", None, 12])
+    sheet.append(["02.01.2022", None, None, 7.5])
+    sheet.append([None, None, None, None])
+    wb.save(raw_tree / "data" / "raw" / "Teststadt" / "2024.xlsx")
+    file = raw_tree / "data" / "interim" / "csv" / "Teststadt" / "2024_Tabelle1.csv"
+
+    to_csv.main()
+    expected = pd.read_csv(file)
+    to_csv.main(force=True, stream=True)
+    streamed = pd.read_csv(file)
+    assert list(streamed.columns) == ["Datum", "Thema", "Unnamed: 2", "Thema.1"]
+    pd.testing.assert_frame_equal(streamed, expected)
@@ -0,0 +1,160 @@
+"""Tests for the unification of the city data sets."""
+
+import pandas as pd
+from dateparser import parse
+
+from german_protest_registrations import export, stage_cache, unify
+from german_protest_registrations.readers.augsburg import augsburg
+from german_protest_registrations.readers.erfurt import erfurt
+from german_protest_registrations.readers.kiel import kiel
+from german_protest_registrations.readers.magdeburg import magdeburg
+from german_protest_registrations.readers.mainz import mainz
+
+
+def test_parallel_read_matches_serial(tmp_path, monkeypatch):
+    monkeypatch.setattr(stage_cache, "cache_dir", tmp_path / "stages")
+    monkeypatch.setattr(unify, "df_readers", [augsburg, kiel, erfurt, mainz])
+    serial = unify.read_dfs()
+    assert serial["city"].unique().tolist() == ["Kiel", "Erfurt", "Mainz"]
+    assert serial["is_regional_capital"].dtype == bool
+    pd.testing.assert_frame_equal(unify.read_dfs(jobs=2), serial)
+
+
+def test_compact_schema():
+    df = pd.DataFrame(
+        {
+            "date": pd.to_datetime(["2023-01-02", "2023-01-03"]),
+            "city": ["Kiel", "Kiel"],
+            "region": ["Schleswig-Holstein", "Schleswig-Holstein"],
+            "is_regional_capital": [True, True],
+            "participants_registered": [150.0, None],
+            "participants_actual": [None, None],
+            "participants_registered_type": ["NUMBER", "UNK"],
+            "participants_actual_type": ["UNK", "UNK"],
+        }
+    )
+    compact = unify.compact_schema(df)
+    assert compact["city"].dtype == "category"
+    assert compact["participants_registered"].dtype == "Int32"
+    assert compact["date"].dtype == "datetime64[s]"
+    assert compact["participants_registered"].tolist() == [150, pd.NA]
+    assert (
+        unify.memory_report(df).loc["total", "compact"]
+        <= unify.memory_report(df).loc["total", "current"]
+    )
+
+
+def test_date_cascade_matches_dateparser():
+    dates = pd.Series(
+        ["01.02.2020", "2021-03-04 00:00:00", "2022-05-06", "05.01.15", "3. Mai 2019", "offen"]
+    )
+    expected = dates.apply(
+        parse, date_formats=["%d.%m.%Y", "%Y-%m-%d %H:%M:%S"], settings={"STRICT_PARSING": True}
+    )
+    parsed = unify.parse_date_strings(dates)
+    pd.testing.assert_series_equal(parsed, pd.to_datetime(expected))
+    assert parsed[3] == pd.Timestamp("2015-05-01")
+
+
+def test_date_texts_are_parsed_once(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    parsed = []
+    parse_date_strings = unify.parse_date_strings
+    monkeypatch.setattr(
+        unify,
+        "parse_date_strings",
+        lambda dates: parsed.append(len(dates)) or parse_date_strings(dates),
+    )
+    texts = pd.Series(["01.02.2020", "01.02.2020 - 03.02.2020", "01.02.2020", "offen"])
+    first = unify.parse_date_texts(texts)
+    assert first.tolist()[:3] == [pd.Timestamp("2020-02-01")] * 3
+    assert pd.isna(first[3])
+    second = unify.parse_date_texts(pd.concat([texts, pd.Series(["2021-03-04"])]))
+    pd.testing.assert_series_equal(second[:4], first)
+    assert parsed == [3, 1]
+
+
+def test_city_date_formats(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(unify, "date_format_hints", {"Kiel": ["%d.%m.%Y"]})
+    texts = pd.Series(["01.02.2020", "01.02.2020 - 03.02.2020", "01.02.2020"])
+    cities = pd.Series(["Kiel", "Kiel", "Mainz"])
+    generic = []
+    parse_date_texts = unify.parse_date_texts
+    monkeypatch.setattr(
+        unify, "parse_date_texts", lambda texts: generic.extend(texts) or parse_date_texts(texts)
+    )
+    parsed = unify.parse_city_dates(texts, cities)
+    assert parsed.tolist() == [pd.Timestamp("2020-02-01")] * 3
+    assert generic == ["01.02.2020 - 03.02.2020", "01.02.2020"]
+
+
+def test_participant_numbers():
+    df = pd.DataFrame(
+        {
+            "participants_registered": [
+                "ca. 1.500 Personen",
+                "100 - 200",
+                "offen",
+                float("nan"),
+                "viele",
+            ],
+            "participants_actual": [12.0, "30 Fahrzeuge", "3 bis 5", "?", "150\nneu: 20"],
+        }
+    )
+    df = unify.parse_participant_numbers(df, ["participants_registered", "participants_actual"])
+    assert df["participants_registered"].tolist() == ["1500", 150, None, None, "viele"]
+    assert df["participants_registered_type"].tolist() == [
+        "NUMBER",
+        "SPAN",
+        "UNK",
+        "UNK",
+        "UNPARSABLE",
+    ]
+    assert df["participants_actual"].tolist() == ["12", "30", 4, None, "15020"]
+    assert df["participants_actual_type"].tolist() == ["NUMBER", "NUMBER", "SPAN", "UNK", "NUMBER"]
+
+
+def test_coverage_table_covers_every_city():
+    coverage = unify.read_coverage()
+    cities = {read.__name__ for read in unify.df_readers}
+    assert len(coverage) == len(cities) == 19
+    assert (coverage["start"] < coverage["end"]).all()
+    # blank cells default to the overall date range
+    assert coverage.loc["Kiel", "end"] == unify.date_range[1]
+    # the subset flags are only given where they override the computed ones
+    assert coverage[["participants", "in_2018_2023"]].stack().isin([True, False]).all()
+    dates = pd.Series(pd.to_datetime(["2021-03-31", "2021-04-01", "2009-12-31", "2023-05-01"]))
+    cities = pd.Series(["Kiel", "Kiel", "Teststadt", "Teststadt"], dtype="category")
+    start = unify._by_city(cities, coverage["start"]).fillna(unify.date_range[0])
+    assert (dates >= start).tolist() == [False, True, False, True]
+
+
+def test_incremental_build_matches_full_build(monkeypatch, tmp_path):
+    # Augsburg gives no rows, and only Magdeburg has actual participant numbers
+    monkeypatch.setattr(unify, "df_readers", [augsburg, kiel, magdeburg, erfurt])
+    monkeypatch.setattr(stage_cache, "cache_dir", tmp_path / "stages")
+    full = unify.process(unify.read_dfs())
+    partitions = [unify.unified_city(read.city) for read in unify.df_readers]
+    assert [df.attrs["rows_read"] for df in partitions] == [
+        len(read()) for read in unify.df_readers
+    ]
+    pd.testing.assert_frame_equal(unify.merge_partitions(partitions), full)
+    # the second time, the partitions are read from the cache
+    partitions = [unify.unified_city(read.city) for read in unify.df_readers]
+    pd.testing.assert_frame_equal(unify.merge_partitions(partitions), full)
+
+
+def test_compact_datasets_export_the_same_text(monkeypatch, tmp_path):
+    monkeypatch.setattr(unify, "df_readers", [kiel, magdeburg, erfurt])
+    monkeypatch.setattr(stage_cache, "cache_dir", tmp_path / "stages")
+    monkeypatch.setattr(export, "data", tmp_path)
+    monkeypatch.setattr(unify, "write_snapshot", lambda df, fingerprint: None)
+    (tmp_path / "processed").mkdir()
+    files = {}
+    for compact in [False, True]:
+        datasets = unify.get_all_datasets(compact=compact, formats=["csv"], jobs=1)
+        files[compact] = {p.name: p.read_bytes() for p in (tmp_path / "processed").iterdir()}
+    assert len(files[True]) == 3
+    assert files[True] == files[False]
+    assert datasets[2]["participants_registered"].dtype == "Int32"